@@ -3,9 +3,12 @@ Content Creator Agent - Creates content based on trending topics.
 """
 from crewai import Agent
 from langchain_groq import ChatGroq
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 import logging
 import random
+from utils.llm_utils import extract_json
+from utils.llm_cache import invalidate_cached_response
+from utils.tracing import tracer
 import config
 
 # Configure logging
@@ -52,7 +55,8 @@ class ContentCreator:
                        tone: str = "informative",
                        target_audience: str = "general",
                        min_words: int = None,
-                       max_words: int = None) -> Dict[str, Any]:
+                       max_words: int = None,
+                       on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Create content based on a trending topic.
         
@@ -63,9 +67,14 @@ class ContentCreator:
             target_audience: Target audience for the content
             min_words: Minimum word count (defaults to config setting)
             max_words: Maximum word count (defaults to config setting)
+            on_token: Optional callback receiving content tokens as the LLM streams them
             
         Returns:
-            Dictionary containing the created content and metadata
+            Dictionary containing the created content and metadata; when the LLM
+            call fails the content is a placeholder and "error" holds the reason
+            
+        Raises:
+            Exception: If streaming the content fails
         """
         min_words = min_words or config.CONTENT_MIN_WORDS
         max_words = max_words or config.CONTENT_MAX_WORDS
@@ -78,8 +87,7 @@ class ContentCreator:
         key_points = topic.get('key_points', [])
         search_results = topic.get('search_results', [])
         
-        # Generate content
-        content = self._generate_content(
+        generation_args = dict(
             title=title,
             description=description,
             key_points=key_points,
@@ -91,32 +99,62 @@ class ContentCreator:
             max_words=max_words
         )
         
+        structured = None
+        error = None
+        try:
+            # Generate content and metadata in one call when not streaming
+            if config.SINGLE_PASS_GENERATION and not on_token:
+                with tracer.span("generate", topic=title, single_pass=True):
+                    structured = self._generate_content_with_metadata(**generation_args)
+            
+            # Generate content on its own when the single-pass response was invalid
+            if not structured:
+                with tracer.span("generate", topic=title, single_pass=False):
+                    content = self._generate_content(**generation_args, on_token=on_token)
+        except Exception as e:
+            # A failed stream has already written partial text, so let the caller discard it
+            if on_token:
+                raise
+            logger.error(f"Error generating content: {e}")
+            error = str(e)
+            content = f"Error generating content for {title}. Please try again later."
+        
         # Generate metadata
-        metadata = self._generate_metadata(title, content, content_type)
+        if error:
+            metadata = self._fallback_metadata(title)
+        elif structured:
+            content, metadata = structured
+        else:
+            with tracer.span("metadata", topic=title):
+                metadata = self._generate_metadata(title, content, content_type)
         
-        return {
+        result = {
             "title": title,
             "content": content,
             "content_type": content_type,
             "tone": tone,
             "target_audience": target_audience,
             "metadata": metadata,
+            "categories": topic.get('categories', []),
             "word_count": len(content.split()),
             "timestamp": self._get_timestamp()
         }
+        if error:
+            result["error"] = error
+        return result
     
-    def _generate_content(self,
-                         title: str,
-                         description: str,
-                         key_points: List[str],
-                         search_results: List[Dict[str, Any]],
-                         content_type: str,
-                         tone: str,
-                         target_audience: str,
-                         min_words: int,
-                         max_words: int) -> str:
+    def _build_content_prompt(self,
+                              title: str,
+                              description: str,
+                              key_points: List[str],
+                              search_results: List[Dict[str, Any]],
+                              content_type: str,
+                              tone: str,
+                              target_audience: str,
+                              min_words: int,
+                              max_words: int) -> str:
         """
-        Generate content using the LLM.
+        Build the prompt asking the LLM to write content about a topic.
         
         Args:
             title: Topic title
@@ -130,7 +168,7 @@ class ContentCreator:
             max_words: Maximum word count
             
         Returns:
-            Generated content
+            Prompt text
         """
         # Format key points as a string
         key_points_str = "\n".join([f"- {point}" for point in key_points])
@@ -163,13 +201,169 @@ class ContentCreator:
         
         Create the complete {content_type} now:
         """
+        return prompt
+    
+    def _generate_content_with_metadata(self,
+                                        title: str,
+                                        description: str,
+                                        key_points: List[str],
+                                        search_results: List[Dict[str, Any]],
+                                        content_type: str,
+                                        tone: str,
+                                        target_audience: str,
+                                        min_words: int,
+                                        max_words: int) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate content and its metadata in a single LLM call.
         
-        try:
-            response = self.llm.invoke(prompt).content.strip()
-            return response
-        except Exception as e:
-            logger.error(f"Error generating content: {e}")
-            return f"Error generating content for {title}. Please try again later."
+        Args:
+            title: Topic title
+            description: Topic description
+            key_points: Key points about the topic
+            search_results: Search results about the topic
+            content_type: Type of content to create
+            tone: Tone of the content
+            target_audience: Target audience for the content
+            min_words: Minimum word count
+            max_words: Maximum word count
+            
+        Returns:
+            Tuple of (content, metadata), or None if the response did not match
+            the expected structure
+            
+        Raises:
+            Exception: If the LLM call fails
+        """
+        prompt = self._build_content_prompt(
+            title=title,
+            description=description,
+            key_points=key_points,
+            search_results=search_results,
+            content_type=content_type,
+            tone=tone,
+            target_audience=target_audience,
+            min_words=min_words,
+            max_words=max_words
+        )
+        prompt += """
+        Respond with only a JSON object with the following fields:
+        - "content": the complete content as a single string
+        - "keywords": a list of 5-7 relevant keywords/tags
+        - "description": a short description (max 150 characters)
+        - "seo_title": an SEO title (max 60 characters)
+        """
+        
+        response = self.llm.invoke(prompt).content.strip()
+        structured = self._parse_structured_response(response)
+        if structured is None:
+            invalidate_cached_response(self.llm, prompt)
+            logger.warning(f"Structured response for {title} did not match the expected schema, "
+                           "falling back to separate content and metadata calls")
+        return structured
+    
+    def _parse_structured_response(self, response: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Validate a single-pass response against the expected schema.
+        
+        Args:
+            response: Raw LLM response
+            
+        Returns:
+            Tuple of (content, metadata), or None if the response is invalid
+        """
+        parsed = extract_json(response)
+        if not isinstance(parsed, dict):
+            return None
+        
+        content = parsed.get("content")
+        keywords = parsed.get("keywords")
+        description = parsed.get("description")
+        seo_title = parsed.get("seo_title")
+        
+        if isinstance(keywords, str):
+            keywords = [k.strip() for k in keywords.split(',') if k.strip()]
+        
+        if not isinstance(content, str) or not content.strip():
+            return None
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            return None
+        if not isinstance(description, str) or not isinstance(seo_title, str):
+            return None
+        
+        metadata = {
+            "keywords": [k.strip() for k in keywords],
+            "description": description.strip(),
+            "seo_title": seo_title.strip()
+        }
+        return content.strip(), metadata
+    
+    def _generate_content(self,
+                         title: str,
+                         description: str,
+                         key_points: List[str],
+                         search_results: List[Dict[str, Any]],
+                         content_type: str,
+                         tone: str,
+                         target_audience: str,
+                         min_words: int,
+                         max_words: int,
+                         on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate content using the LLM.
+        
+        Args:
+            title: Topic title
+            description: Topic description
+            key_points: Key points about the topic
+            search_results: Search results about the topic
+            content_type: Type of content to create
+            tone: Tone of the content
+            target_audience: Target audience for the content
+            min_words: Minimum word count
+            max_words: Maximum word count
+            on_token: Optional callback; when given the response is streamed and
+                each token is passed to it as it arrives
+            
+        Returns:
+            Generated content
+            
+        Raises:
+            Exception: If the LLM call fails
+        """
+        prompt = self._build_content_prompt(
+            title=title,
+            description=description,
+            key_points=key_points,
+            search_results=search_results,
+            content_type=content_type,
+            tone=tone,
+            target_audience=target_audience,
+            min_words=min_words,
+            max_words=max_words
+        )
+        
+        if on_token:
+            return self._stream_response(prompt, on_token).strip()
+        return self.llm.invoke(prompt).content.strip()
+    
+    def _stream_response(self, prompt: str, on_token: Callable[[str], None]) -> str:
+        """
+        Stream an LLM response, passing each token to a callback.
+        
+        Args:
+            prompt: Prompt to send to the LLM
+            on_token: Callback receiving each token as it arrives
+            
+        Returns:
+            Complete response text
+        """
+        parts = []
+        for chunk in self.llm.stream(prompt):
+            token = chunk.content
+            if token:
+                parts.append(token)
+                on_token(token)
+        return "".join(parts)
     
     def _generate_metadata(self, title: str, content: str, content_type: str) -> Dict[str, Any]:
         """
@@ -220,14 +414,28 @@ class ContentCreator:
                 elif line.startswith('SEO Title:'):
                     metadata['seo_title'] = line.replace('SEO Title:', '').strip()
             
+            if not any(metadata.values()):
+                invalidate_cached_response(self.llm, prompt)
             return metadata
         except Exception as e:
             logger.error(f"Error generating metadata: {e}")
-            return {
-                "keywords": [title.lower()],
-                "description": f"Content about {title}",
-                "seo_title": title
-            }
+            return self._fallback_metadata(title)
+    
+    def _fallback_metadata(self, title: str) -> Dict[str, Any]:
+        """
+        Build metadata from the title alone.
+        
+        Args:
+            title: Content title
+            
+        Returns:
+            Dictionary of metadata
+        """
+        return {
+            "keywords": [title.lower()],
+            "description": f"Content about {title}",
+            "seo_title": title
+        }
     
     def _get_timestamp(self) -> str:
         """
@@ -3,10 +3,17 @@ Trend Searcher Agent - Searches the web for trending topics.
 """
 from crewai import Agent
 from langchain_groq import ChatGroq
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 import random
-from utils.web_utils import fetch_webpage, extract_trending_topics_from_google_trends, search_web_for_topic
+from concurrent.futures import ThreadPoolExecutor
+from utils.web_utils import search_web_for_topic
+from utils.source_fetcher import collect_trending_topics
+from utils.llm_utils import chunk_by_token_budget, extract_json
+from utils.llm_cache import invalidate_cached_response
+from utils.tracing import tracer
+from utils.topic_store import TopicStore
+from utils.dedup import collapse_near_duplicates
 import config
 
 # Configure logging
@@ -18,14 +25,17 @@ class TrendSearcher:
     Agent responsible for searching the web for trending topics.
     """
     
-    def __init__(self, llm):
+    def __init__(self, llm, topic_store: Optional[TopicStore] = None):
         """
         Initialize the TrendSearcher agent.
         
         Args:
             llm: Language model to use for the agent
+            topic_store: Optional store of topics seen in earlier runs; when given,
+                only new or changed topics are returned and enrichment is reused
         """
         self.llm = llm
+        self.topic_store = topic_store
         self.agent = self._create_agent()
     
     def _create_agent(self) -> Agent:
@@ -58,43 +68,108 @@ class TrendSearcher:
         Returns:
             List of trending topics with details
         """
-        logger.info(f"Searching for trending topics{' in ' + category if category else ''}")
+        if category:
+            return self.search_trending_topics_by_category([category], max_topics)[category]
         
-        all_topics = []
+        logger.info("Searching for trending topics")
         
-        # Fetch from multiple sources
-        for source_url in config.TRENDING_SOURCES:
-            try:
-                html_content = fetch_webpage(source_url)
-                if "google.com/trends" in source_url:
-                    topics = extract_trending_topics_from_google_trends(html_content)
-                    all_topics.extend(topics)
-            except Exception as e:
-                logger.error(f"Error fetching trends from {source_url}: {e}")
+        all_topics = self._collect_topics()
+        
+        # Limit to max_topics and enrich topics with additional information
+        return self._enrich_topics(all_topics[:max_topics])
+    
+    def search_trending_topics_by_category(self, categories: List[str], max_topics: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search for trending topics in several categories at once.
+        
+        The sources are scraped once for all categories, and a topic selected
+        for more than one category is only enriched once. Each returned topic
+        lists every requested category it was selected for under 'categories'.
+        
+        Args:
+            categories: Categories to filter topics by
+            max_topics: Maximum number of topics to return per category
+            
+        Returns:
+            Dictionary mapping each category to its list of trending topics with details
+        """
+        logger.info(f"Searching for trending topics in {', '.join(categories)}")
+        
+        all_topics = self._collect_topics()
+        
+        # Use the LLM to determine which topics belong to each category
+        selected = {}
+        for category in categories:
+            relevance = self._classify_topics(all_topics, category)
+            relevant_topics = [topic for topic in all_topics if relevance.get(topic['title'], True)]
+            selected[category] = relevant_topics[:max_topics]
+        
+        # Enrich each distinct topic only once
+        unique_topics = {}
+        for category, topics in selected.items():
+            for topic in topics:
+                key = self._topic_key(topic)
+                if key not in unique_topics:
+                    unique_topics[key] = {**topic, "categories": []}
+                unique_topics[key]["categories"].append(category)
+        
+        logger.info(f"Selected {len(unique_topics)} distinct topics across {len(categories)} categories")
+        enriched = dict(zip(unique_topics, self._enrich_topics(list(unique_topics.values()))))
+        
+        return {
+            category: [enriched[self._topic_key(topic)] for topic in topics]
+            for category, topics in selected.items()
+        }
+    
+    def _collect_topics(self) -> List[Dict[str, Any]]:
+        """
+        Collect candidate topics from all trending sources.
+        
+        Returns:
+            List of scraped topics, or fallback topics if no source returned any,
+            with near-duplicates collapsed and limited to new or changed topics
+            when a topic store is used
+        """
+        # Fetch from all sources in parallel
+        with tracer.span("fetch") as span:
+            all_topics = collect_trending_topics(config.TRENDING_SOURCES)
+            span.set(topics=len(all_topics))
         
         # If no topics found, create some generic ones for demonstration
         if not all_topics:
             logger.warning("No topics found from sources, using fallback topics")
             all_topics = self._generate_fallback_topics()
         
-        # Filter by category if specified
-        if category:
-            filtered_topics = []
-            for topic in all_topics:
-                # Use the LLM to determine if the topic belongs to the category
-                topic_text = f"{topic['title']}. {topic.get('description', '')}"
-                is_relevant = self._is_topic_relevant_to_category(topic_text, category)
-                if is_relevant:
-                    filtered_topics.append(topic)
-            all_topics = filtered_topics
-        
-        # Limit to max_topics
-        selected_topics = all_topics[:max_topics]
-        
-        # Enrich topics with additional information
-        enriched_topics = self._enrich_topics(selected_topics)
-        
-        return enriched_topics
+        # Keep one topic per story reported by several sources
+        if config.DEDUP_ENABLED:
+            with tracer.span("dedup", topics=len(all_topics)) as span:
+                all_topics = collapse_near_duplicates(
+                    all_topics,
+                    threshold=config.DEDUP_THRESHOLD,
+                    num_perm=config.DEDUP_NUM_PERM,
+                    embedding_model=config.DEDUP_EMBEDDING_MODEL,
+                    embedding_threshold=config.DEDUP_EMBEDDING_THRESHOLD
+                )
+                span.set(kept=len(all_topics))
+        
+        # Skip topics already covered in earlier runs
+        if self.topic_store:
+            all_topics = self.topic_store.filter_new_or_changed(all_topics)
+        
+        return all_topics
+    
+    @staticmethod
+    def _topic_key(topic: Dict[str, Any]) -> str:
+        """
+        Get the key identifying a topic across categories.
+        
+        Args:
+            topic: Topic information
+            
+        Returns:
+            Normalized topic title
+        """
+        return " ".join(topic['title'].lower().split())
     
     def _generate_fallback_topics(self) -> List[Dict[str, Any]]:
         """
@@ -133,45 +208,171 @@ class TrendSearcher:
         
         try:
             response = self.llm.invoke(prompt).content.strip().lower()
+            if response not in ("yes", "no"):
+                invalidate_cached_response(self.llm, prompt)
             return response == "yes"
         except Exception as e:
             logger.error(f"Error determining topic relevance: {e}")
             # Default to including the topic if there's an error
             return True
     
-    def _enrich_topics(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _classify_topics(self, topics: List[Dict[str, Any]], category: str,
+                         token_budget: int = None) -> Dict[str, bool]:
+        """
+        Use the LLM to determine which topics are relevant to a category.
+        
+        All topics are sent in a single numbered prompt, split into several
+        prompts only when the list exceeds the token budget. Topics whose
+        answer cannot be parsed are classified individually.
+        
+        Args:
+            topics: Topics to classify
+            category: Category to check relevance against
+            token_budget: Maximum estimated tokens of topic text per prompt (defaults to config setting)
+            
+        Returns:
+            Dictionary mapping topic titles to their relevance
+        """
+        token_budget = token_budget or config.CLASSIFICATION_TOKEN_BUDGET
+        topic_texts = [f"{topic['title']}. {topic.get('description', '')}" for topic in topics]
+        
+        relevance = {}
+        with tracer.span("classify", category=category, topics=len(topics)):
+            for chunk in chunk_by_token_budget(topic_texts, token_budget):
+                answers = self._classify_topic_batch([topic_texts[i] for i in chunk], category)
+                
+                for position, index in enumerate(chunk):
+                    is_relevant = answers.get(position + 1)
+                    if is_relevant is None:
+                        logger.warning(f"No batched relevance answer for topic {topics[index]['title']}, asking individually")
+                        is_relevant = self._is_topic_relevant_to_category(topic_texts[index], category)
+                    relevance[topics[index]['title']] = is_relevant
+        
+        return relevance
+    
+    def _classify_topic_batch(self, topic_texts: List[str], category: str) -> Dict[int, bool]:
+        """
+        Ask the LLM about the relevance of several topics in one call.
+        
+        Args:
+            topic_texts: Texts describing the topics
+            category: Category to check relevance against
+            
+        Returns:
+            Dictionary mapping 1-based topic numbers to their relevance; topics
+            without a usable answer are omitted
+        """
+        numbered_topics = "\n".join(f"{i}. {text}" for i, text in enumerate(topic_texts, start=1))
+        
+        prompt = f"""
+        Determine which of the following topics are relevant to the category '{category}':
+        
+        {numbered_topics}
+        
+        Answer with only a JSON object mapping each topic number to 'yes' or 'no', for example:
+        {{"1": "yes", "2": "no"}}
+        """
+        
+        try:
+            response = self.llm.invoke(prompt).content.strip()
+        except Exception as e:
+            logger.error(f"Error determining topic relevance in batch: {e}")
+            return {}
+        
+        parsed = extract_json(response)
+        if not isinstance(parsed, dict):
+            logger.warning("Could not parse batched topic relevance response")
+            invalidate_cached_response(self.llm, prompt)
+            return {}
+        
+        answers = {}
+        for key, value in parsed.items():
+            try:
+                number = int(key)
+            except (TypeError, ValueError):
+                continue
+            answer = str(value).strip().lower()
+            if answer in ("yes", "no"):
+                answers[number] = answer == "yes"
+        
+        # Do not replay a response that leaves topics unanswered
+        if len(answers) < len(topic_texts):
+            invalidate_cached_response(self.llm, prompt)
+        
+        return answers
+    
+    def _enrich_topics(self, topics: List[Dict[str, Any]], max_workers: int = None) -> List[Dict[str, Any]]:
         """
         Enrich topics with additional information.
         
+        Topics are enriched concurrently on a bounded thread pool so that the
+        web searches and LLM calls for different topics overlap. The returned
+        list keeps the order of the input topics.
+        
         Args:
             topics: List of topics to enrich
+            max_workers: Maximum number of topics enriched at once (defaults to config setting)
             
         Returns:
             List of enriched topics
         """
-        enriched_topics = []
+        if not topics:
+            return []
         
-        for topic in topics:
-            try:
-                # Get additional information about the topic
+        max_workers = max(1, min(max_workers or config.ENRICHMENT_CONCURRENCY, len(topics)))
+        logger.info(f"Enriching {len(topics)} topics with up to {max_workers} workers")
+        
+        with tracer.span("enrich", topics=len(topics)):
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrich") as executor:
+                return list(executor.map(tracer.bind(self._enrich_topic), topics))
+    
+    def _enrich_topic(self, topic: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enrich a single topic with search results and key points.
+        
+        Args:
+            topic: Topic to enrich
+            
+        Returns:
+            Enriched topic, or the original topic if enrichment fails
+        """
+        # Reuse the enrichment from an earlier run of the same topic version
+        if self.topic_store:
+            stored_enrichment = self.topic_store.get_enrichment(topic)
+            if stored_enrichment:
+                logger.info(f"Reusing stored enrichment for topic {topic['title']}")
+                return {**topic, **stored_enrichment}
+        
+        try:
+            # Get additional information about the topic
+            with tracer.span("search", topic=topic['title']):
                 search_results = search_web_for_topic(topic['title'])
-                
-                # Extract key points using the LLM
-                key_points = self._extract_key_points(topic['title'], search_results)
-                
-                enriched_topic = {
-                    **topic,
-                    "search_results": search_results,
-                    "key_points": key_points
-                }
-                
-                enriched_topics.append(enriched_topic)
+            
+            # Extract key points using the LLM
+            key_points_failed = False
+            try:
+                with tracer.span("key_points", topic=topic['title']):
+                    key_points = self._extract_key_points(topic['title'], search_results)
             except Exception as e:
-                logger.error(f"Error enriching topic {topic['title']}: {e}")
-                # Include the original topic if enrichment fails
-                enriched_topics.append(topic)
-        
-        return enriched_topics
+                logger.error(f"Error extracting key points: {e}")
+                key_points = ["No key points available due to processing error"]
+                key_points_failed = True
+            
+            enriched_topic = {
+                **topic,
+                "search_results": search_results,
+                "key_points": key_points
+            }
+            
+            # Only keep complete enrichment; a failed search or LLM call is retried next run
+            if self.topic_store and search_results and not key_points_failed:
+                self.topic_store.record_enrichment(enriched_topic)
+            
+            return enriched_topic
+        except Exception as e:
+            logger.error(f"Error enriching topic {topic['title']}: {e}")
+            # Include the original topic if enrichment fails
+            return topic
     
     def _extract_key_points(self, topic_title: str, search_results: List[Dict[str, Any]]) -> List[str]:
         """
@@ -183,6 +384,9 @@ class TrendSearcher:
             
         Returns:
             List of key points about the topic
+            
+        Raises:
+            Exception: If the LLM call fails
         """
         # Combine search result snippets
         combined_text = "\n".join([result.get('snippet', '') for result in search_results if 'snippet' in result])
@@ -195,17 +399,15 @@ class TrendSearcher:
         Format each key point as a separate bullet point.
         """
         
-        try:
-            response = self.llm.invoke(prompt).content.strip()
-            
-            # Parse bullet points
-            key_points = []
-            for line in response.split('\n'):
-                line = line.strip()
-                if line.startswith('•') or line.startswith('-') or line.startswith('*'):
-                    key_points.append(line.lstrip('•-* '))
-            
-            return key_points
-        except Exception as e:
-            logger.error(f"Error extracting key points: {e}")
-            return ["No key points available due to processing error"]
+        response = self.llm.invoke(prompt).content.strip()
+        
+        # Parse bullet points
+        key_points = []
+        for line in response.split('\n'):
+            line = line.strip()
+            if line.startswith('•') or line.startswith('-') or line.startswith('*'):
+                key_points.append(line.lstrip('•-* '))
+        
+        if not key_points:
+            invalidate_cached_response(self.llm, prompt)
+        return key_points
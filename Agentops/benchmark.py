@@ -0,0 +1,204 @@
+"""
+Offline record/replay benchmark for the content creation pipeline.
+
+Record fixtures from a live run (needs GROQ_API_KEY and network access):
+
+    python benchmark.py record fixtures/run.json --categories Technology
+
+Replay them against a fake LLM and a local HTTP stand-in, with simulated latency:
+
+    python benchmark.py replay fixtures/run.json --llm-latency lognormal:0,0.5 --http-latency uniform:0.05,0.3 --runs 3
+"""
+import os
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+from typing import List, Dict, Any, Optional
+
+from utils.llm_cache import LLMResponseCache, CachedLLM
+from utils.replay import Fixtures, LatencyDistribution, RecordingLLM, FakeLLM, StandInServer
+from utils.tracing import tracer, TracedLLM
+from utils import web_utils
+import config
+import main as pipeline
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def record(fixture_path: str, categories: Optional[List[str]]):
+    """
+    Run the live pipeline and record its LLM and HTTP traffic.
+
+    Args:
+        fixture_path: File to write the fixtures to
+        categories: Categories to run (defaults to the first configured category)
+    """
+    fixtures = Fixtures(metadata={"model": config.LLM_MODEL, "categories": categories or config.CONTENT_CATEGORIES[:1]})
+    web_utils.add_fetch_observer(fixtures.record_http)
+    output_dir = tempfile.mkdtemp(prefix="benchmark_record_")
+
+    try:
+        llm = RecordingLLM(pipeline.setup_llm(), fixtures)
+        pipeline.run_pipeline(categories, "benchmark_record", llm=llm, output_dir=output_dir, enable_monitoring=False)
+    finally:
+        web_utils.remove_fetch_observer(fixtures.record_http)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    fixtures.save(fixture_path)
+
+def replay(fixture_path: str,
+           categories: Optional[List[str]],
+           runs: int,
+           llm_latency: str,
+           http_latency: str,
+           seed: Optional[int],
+           with_cache: bool) -> Dict[str, Any]:
+    """
+    Replay recorded fixtures through the pipeline and measure it.
+
+    The LLM is replaced by FakeLLM and every page is served by a local
+    stand-in server. The HTTP cache and (unless with_cache is set) the LLM
+    response cache are disabled so every run does the full amount of work.
+    The fake LLM is not rate limited.
+
+    Args:
+        fixture_path: Recorded fixture file
+        categories: Categories to run (defaults to the recorded categories)
+        runs: Number of pipeline runs
+        llm_latency: Latency distribution spec for LLM calls
+        http_latency: Latency distribution spec for HTTP requests
+        seed: Random seed for the latency distributions
+        with_cache: Put a fresh LLM response cache in front of the fake LLM
+
+    Returns:
+        Benchmark report
+    """
+    fixtures = Fixtures.load(fixture_path)
+    categories = categories or fixtures.metadata.get("categories")
+    config.HTTP_CACHE_ENABLED = False
+
+    fake_llm = FakeLLM(fixtures, LatencyDistribution(llm_latency, seed))
+    work_dir = tempfile.mkdtemp(prefix="benchmark_replay_")
+    llm = fake_llm
+    if with_cache:
+        cache = LLMResponseCache(os.path.join(work_dir, "llm_cache.sqlite"), ttl=3600,
+                                 max_entries=config.LLM_CACHE_MAX_ENTRIES, max_bytes=config.LLM_CACHE_MAX_BYTES)
+        llm = CachedLLM(fake_llm, cache)
+    llm = TracedLLM(llm)
+
+    run_results = []
+    tracer.enabled = True
+    tracer.reset()
+
+    with StandInServer(fixtures, LatencyDistribution(http_latency, seed)) as stand_in:
+        web_utils.set_url_rewriter(stand_in.rewrite)
+        try:
+            for run in range(1, runs + 1):
+                output_dir = os.path.join(work_dir, f"run_{run}")
+                started = time.perf_counter()
+                with tracer.span("run", run=run):
+                    results = pipeline.run_pipeline(categories, f"benchmark_replay_{run}", llm=llm,
+                                                    output_dir=output_dir, enable_monitoring=False)
+                elapsed = time.perf_counter() - started
+                articles = sum(1 for result in results or [] if result)
+                run_results.append({"run": run, "seconds": elapsed, "articles": articles})
+                logger.info(f"Run {run}/{runs}: {articles} articles in {elapsed:.2f}s")
+        finally:
+            web_utils.set_url_rewriter(None)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        http_requests, http_misses = stand_in.requests, stand_in.misses
+
+    total_seconds = sum(r["seconds"] for r in run_results)
+    total_articles = sum(r["articles"] for r in run_results)
+    return {
+        "fixtures": fixture_path,
+        "categories": categories,
+        "runs": run_results,
+        "llm_latency": llm_latency,
+        "http_latency": http_latency,
+        "content_workers": config.CONTENT_WORKERS,
+        "enrichment_concurrency": config.ENRICHMENT_CONCURRENCY,
+        "llm_cache": with_cache,
+        "total_seconds": total_seconds,
+        "articles": total_articles,
+        "articles_per_minute": total_articles / total_seconds * 60 if total_seconds else 0.0,
+        "llm_calls": fake_llm.calls,
+        "llm_replay_misses": fake_llm.misses,
+        "http_requests": http_requests,
+        "http_replay_misses": http_misses,
+        "stages": tracer.summary(),
+    }
+
+def print_report(report: Dict[str, Any]):
+    """
+    Print a benchmark report.
+
+    Args:
+        report: Report returned by replay()
+    """
+    print(f"\nReplayed {report['fixtures']} for {', '.join(report['categories'] or [])}")
+    print(f"LLM latency: {report['llm_latency']}, HTTP latency: {report['http_latency']}, "
+          f"content workers: {report['content_workers']}, enrichment concurrency: {report['enrichment_concurrency']}, "
+          f"LLM cache: {'on' if report['llm_cache'] else 'off'}")
+    for run in report["runs"]:
+        print(f"  run {run['run']}: {run['articles']} articles in {run['seconds']:.2f}s")
+    print(f"Throughput: {report['articles_per_minute']:.1f} articles/min over {report['total_seconds']:.2f}s")
+    print(f"LLM calls: {report['llm_calls']} ({report['llm_replay_misses']} replay misses), "
+          f"HTTP requests: {report['http_requests']} ({report['http_replay_misses']} replay misses)\n")
+    print(tracer.format_summary())
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Record/replay benchmark for the content creation pipeline")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record fixtures from a live run")
+    record_parser.add_argument("fixtures", help="Fixture file to write")
+    record_parser.add_argument("--categories", nargs="+", choices=config.CONTENT_CATEGORIES, metavar="CATEGORY")
+
+    replay_parser = subparsers.add_parser("replay", help="Benchmark the pipeline against recorded fixtures")
+    replay_parser.add_argument("fixtures", help="Fixture file to replay")
+    replay_parser.add_argument("--categories", nargs="+", choices=config.CONTENT_CATEGORIES, metavar="CATEGORY")
+    replay_parser.add_argument("--runs", type=int, default=1, help="Number of pipeline runs")
+    replay_parser.add_argument("--llm-latency", default="lognormal:0,0.5",
+                               help="LLM latency distribution, e.g. constant:1.5, uniform:0.5,3 or lognormal:0,0.5")
+    replay_parser.add_argument("--http-latency", default="uniform:0.05,0.3", help="HTTP latency distribution")
+    replay_parser.add_argument("--seed", type=int, default=None, help="Random seed for the latency distributions")
+    replay_parser.add_argument("--workers", type=int, default=None, help="Override CONTENT_WORKERS")
+    replay_parser.add_argument("--enrichment-concurrency", type=int, default=None, help="Override ENRICHMENT_CONCURRENCY")
+    replay_parser.add_argument("--with-cache", action="store_true", help="Enable a fresh LLM response cache")
+    replay_parser.add_argument("--report", help="Write the report as JSON to this file")
+
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    config.TRACE_ENABLED = True
+
+    if args.mode == "record":
+        record(args.fixtures, args.categories)
+    else:
+        if args.workers:
+            config.CONTENT_WORKERS = args.workers
+            config.CONTENT_MAX_PENDING = args.workers * 2
+        if args.enrichment_concurrency:
+            config.ENRICHMENT_CONCURRENCY = args.enrichment_concurrency
+
+        report = replay(args.fixtures, args.categories, args.runs, args.llm_latency,
+                        args.http_latency, args.seed, args.with_cache)
+        print_report(report)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
@@ -13,11 +13,32 @@ AGENTOPS_API_KEY = os.getenv("AGENTOPS_API_KEY")
 
 # LLM Configuration
 LLM_MODEL = "llama-3.1-70b-versatile"  # Groq's LLaMA Versatile model
+LLM_TEMPERATURE = 0.7  # Sampling temperature
+
+# LLM Rate Limits (Groq free tier for the model above; raise for paid plans)
+GROQ_REQUESTS_PER_MINUTE = 30  # Maximum LLM requests per minute
+GROQ_TOKENS_PER_MINUTE = 6000  # Maximum LLM tokens per minute
+LLM_COMPLETION_TOKEN_ESTIMATE = 1000  # Completion tokens reserved per request until its actual usage is reported
+LLM_MAX_RETRIES = 5  # Retries after a 429 rate limit response
+LLM_RETRY_BASE_DELAY = 2.0  # Base delay in seconds for exponential backoff with jitter
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = True  # Reuse responses for identical prompts across runs
+LLM_CACHE_PATH = ".llm_cache/responses.sqlite"  # SQLite database for cached responses
+LLM_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached response stays valid
+LLM_CACHE_MAX_ENTRIES = 5000  # Maximum number of cached responses
+LLM_CACHE_MAX_BYTES = 100 * 1024 * 1024  # Maximum total size of cached responses
 
 # Agent Configuration
 MAX_TRENDING_TOPICS = 5  # Maximum number of trending topics to retrieve
 CONTENT_MIN_WORDS = 500  # Minimum word count for generated content
 CONTENT_MAX_WORDS = 1000  # Maximum word count for generated content
+SINGLE_PASS_GENERATION = True  # Generate content and metadata in one LLM call (ignored when streaming)
+STREAM_CONTENT = False  # Stream article tokens to the .txt output file as they are generated
+CONTENT_WORKERS = 3  # Number of topics whose content is generated concurrently
+CONTENT_MAX_PENDING = 6  # Maximum topics queued or in progress at once
+ENRICHMENT_CONCURRENCY = 4  # Maximum number of topics enriched in parallel
+CLASSIFICATION_TOKEN_BUDGET = 1500  # Maximum estimated tokens of topic text per category classification prompt
 
 # Web Sources for Trending Topics
 TRENDING_SOURCES = [
@@ -25,6 +46,50 @@ TRENDING_SOURCES = [
     "https://twitter.com/explore/tabs/trending",
     "https://www.reddit.com/r/popular/",
 ]
+SOURCE_FETCH_TIMEOUT = 10  # Deadline in seconds for each trending source
+SOURCE_FETCH_BUDGET = 15  # Deadline in seconds for fetching all trending sources
+
+# Topic Deduplication
+DEDUP_ENABLED = True  # Collapse near-duplicate topics from different sources before classification and enrichment
+DEDUP_THRESHOLD = 0.5  # Minimum Jaccard similarity of title + description words for two topics to be duplicates
+DEDUP_NUM_PERM = 64  # MinHash signature length used to find candidate duplicates
+DEDUP_EMBEDDING_MODEL = None  # Optional local sentence-transformers model, e.g. "all-MiniLM-L6-v2"
+DEDUP_EMBEDDING_THRESHOLD = 0.85  # Minimum cosine similarity of embeddings for two topics to be duplicates
+
+# Output Configuration
+OUTPUT_MODE = "files"  # "files" (JSON + text file per article) or "jsonl" (compressed JSONL shards with an index; also: --output-mode)
+OUTPUT_SHARD_WIDTH = 0  # files mode: hex characters of the title hash used as subdirectory name (0 = flat output directory)
+OUTPUT_RECORDS_PER_SHARD = 1000  # jsonl mode: articles per compressed shard
+OUTPUT_SHARD_MAX_SECONDS = 3600  # jsonl mode: a shard older than this is finalized at the next write
+OUTPUT_SYNC_RECORDS = 50  # jsonl mode: articles written between disk syncs of the open shard
+OUTPUT_SYNC_SECONDS = 5  # jsonl mode: maximum seconds between disk syncs of the open shard
+
+# Incremental Runs
+INCREMENTAL_RUNS = False  # Only process topics that are new or changed since earlier runs (also: --incremental)
+TOPIC_STORE_PATH = ".topic_store/topics.sqlite"  # SQLite database of seen topics
+
+# HTTP Configuration
+HTTP_POOL_CONNECTIONS = 10  # Number of hosts kept in the connection pool
+HTTP_POOL_MAXSIZE = 4  # Maximum open connections per host
+HTTP_CACHE_ENABLED = True  # Cache fetched pages on disk between runs
+HTTP_CACHE_DIR = ".http_cache"  # Directory for cached pages
+HTTP_CACHE_TTL = 900  # Seconds a cached page is used before revalidating with the server
+HTTP_CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds an unused cached page is kept (also served when a fetch fails)
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Maximum total size of the page cache
+HTTP_CACHE_EVICT_EVERY = 50  # Cached page writes between eviction passes
+HTML_PARSER = "auto"  # "auto" (fastest installed), "selectolax", "lxml" or "html.parser"
+
+# Monitoring Configuration
+MONITORING_BUFFERED = True  # Export AgentOps events from a background thread
+MONITORING_QUEUE_SIZE = 1000  # Maximum number of buffered events
+MONITORING_BATCH_SIZE = 50  # Maximum number of events exported per flush
+MONITORING_FLUSH_INTERVAL = 1.0  # Maximum seconds an event stays buffered
+MONITORING_OVERFLOW_POLICY = "drop_oldest"  # When the buffer is full: "drop_oldest" or "block"
+MONITORING_DRAIN_TIMEOUT = 10.0  # Seconds to wait for buffered events when a session ends
+
+# Tracing Configuration
+TRACE_ENABLED = True  # Record per-stage timings, token counts and cache hits for each run
+TRACE_DIR = "traces"  # Directory for JSONL traces and per-stage summary tables
 
 # Content Categories
 CONTENT_CATEGORIES = [
@@ -2,10 +2,10 @@
 Main application for the content creation multi-agent system.
 """
 import os
+import argparse
 import logging
-import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
 # Import LLM
@@ -17,6 +17,12 @@ from langchain_groq import ChatGroq
 from agents.trend_searcher import TrendSearcher
 from agents.content_creator import ContentCreator
 from utils.monitoring import AgentOpsMonitoring
+from utils.llm_cache import LLMResponseCache, CachedLLM
+from utils.output_writer import OutputSink, FileOutputSink, create_output_sink
+from utils.rate_limiter import RateLimiter, RateLimitedLLM
+from utils.scheduler import ContentScheduler
+from utils.tracing import tracer, TracedLLM
+from utils.topic_store import TopicStore
 import config
 
 # Configure logging
@@ -46,16 +52,55 @@ def setup_llm():
         logger.warning("Please set a valid GROQ_API_KEY in your .env file.")
 
     try:
-        return ChatGroq(
+        llm = ChatGroq(
             groq_api_key=api_key,
             model_name=config.LLM_MODEL,
-            temperature=0.7,
+            temperature=config.LLM_TEMPERATURE,
             max_tokens=4096
         )
     except Exception as e:
         logger.error(f"Error setting up LLM: {e}")
         raise
 
+    # Share one quota across all agents and worker threads
+    limiter = RateLimiter(
+        requests_per_minute=config.GROQ_REQUESTS_PER_MINUTE,
+        tokens_per_minute=config.GROQ_TOKENS_PER_MINUTE
+    )
+    llm = RateLimitedLLM(
+        llm,
+        limiter,
+        completion_tokens=config.LLM_COMPLETION_TOKEN_ESTIMATE,
+        max_retries=config.LLM_MAX_RETRIES,
+        base_delay=config.LLM_RETRY_BASE_DELAY
+    )
+
+    if config.LLM_CACHE_ENABLED:
+        cache = LLMResponseCache(
+            path=config.LLM_CACHE_PATH,
+            ttl=config.LLM_CACHE_TTL,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            max_bytes=config.LLM_CACHE_MAX_BYTES
+        )
+        llm = CachedLLM(llm, cache, model_name=config.LLM_MODEL, temperature=config.LLM_TEMPERATURE)
+        logger.info(f"LLM response cache enabled at {config.LLM_CACHE_PATH}")
+
+    # Outermost, so cache hits are visible in the trace
+    return TracedLLM(llm)
+
+def log_cache_stats(llm):
+    """
+    Log hit-rate metrics of the LLM response cache.
+
+    Args:
+        llm: LLM returned by setup_llm
+    """
+    cache = getattr(llm, "cache", None)
+    if isinstance(cache, LLMResponseCache):
+        stats = cache.stats()
+        logger.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
+
 def setup_monitoring():
     """
     Set up AgentOps monitoring.
@@ -68,78 +113,302 @@ def setup_monitoring():
         logger.warning("AGENTOPS_API_KEY environment variable not set, monitoring will be disabled")
         return None
 
-    return AgentOpsMonitoring(api_key=api_key, project_name="content_creation_agents")
+    return AgentOpsMonitoring(
+        api_key=api_key,
+        project_name="content_creation_agents",
+        buffered=config.MONITORING_BUFFERED,
+        max_queue_size=config.MONITORING_QUEUE_SIZE,
+        batch_size=config.MONITORING_BATCH_SIZE,
+        flush_interval=config.MONITORING_FLUSH_INTERVAL,
+        overflow_policy=config.MONITORING_OVERFLOW_POLICY,
+        drain_timeout=config.MONITORING_DRAIN_TIMEOUT
+    )
+
+def setup_output_sink(output_dir: str = "output", output_mode: str = None) -> OutputSink:
+    """
+    Set up the destination for generated content.
+
+    Args:
+        output_dir: Directory to save content to
+        output_mode: "files" or "jsonl" (defaults to config setting)
 
-def save_content(content: Dict[str, Any], output_dir: str = "output"):
+    Returns:
+        Output sink
+    """
+    return create_output_sink(
+        output_mode or config.OUTPUT_MODE,
+        output_dir,
+        shard_width=config.OUTPUT_SHARD_WIDTH,
+        records_per_shard=config.OUTPUT_RECORDS_PER_SHARD,
+        max_shard_seconds=config.OUTPUT_SHARD_MAX_SECONDS,
+        sync_records=config.OUTPUT_SYNC_RECORDS,
+        sync_seconds=config.OUTPUT_SYNC_SECONDS
+    )
+
+def save_content(content: Dict[str, Any], output_sink: OutputSink):
     """
-    Save generated content to a file.
+    Save generated content to the output sink.
 
     Args:
         content: Content to save
-        output_dir: Directory to save content to
+        output_sink: Destination for the content
+    """
+    output_sink.write(content)
+
+def log_stream_progress(event: Dict[str, Any]):
+    """
+    Log progress events from a streaming content writer.
+
+    Args:
+        event: Progress event emitted by StreamingContentWriter
+    """
+    if event["event"] == "token":
+        if event["tokens"] == 1:
+            logger.info(f"First token for '{event['title']}' after {event['time_to_first_token']:.2f}s, "
+                        f"streaming to {event['text_filepath']}")
+        elif event["tokens"] % 200 == 0:
+            logger.debug(f"Streamed {event['tokens']} tokens for '{event['title']}'")
+    elif event["event"] == "completed":
+        logger.info(f"Streamed {event['tokens']} tokens for '{event['title']}' in {event['elapsed']:.2f}s")
+    elif event["event"] == "failed":
+        logger.warning(f"Streaming '{event['title']}' failed after {event['tokens']} tokens, "
+                       f"removed {event['text_filepath']}")
+
+def create_and_stream_content(content_creator: ContentCreator, topic: Dict[str, Any], output_sink: FileOutputSink) -> Dict[str, Any]:
+    """
+    Create content for a topic, writing the text version as tokens arrive.
+
+    Args:
+        content_creator: Content creator agent
+        topic: Topic to create content for
+        output_sink: File sink to save content to
+
+    Returns:
+        Created content
+    """
+    writer = output_sink.streaming_writer(topic['title'], on_progress=log_stream_progress)
+    try:
+        content = content_creator.create_content(
+            topic=topic,
+            content_type="article",
+            tone="informative",
+            target_audience="general",
+            on_token=writer.write
+        )
+    except Exception:
+        writer.abort()
+        raise
+
+    writer.finalize(content)
+    return content
+
+def produce_content(content_creator: ContentCreator,
+                    monitoring: Optional[AgentOpsMonitoring],
+                    topic: Dict[str, Any],
+                    index: int,
+                    total: int,
+                    output_sink: OutputSink,
+                    topic_store: Optional[TopicStore] = None) -> Dict[str, Any]:
+    """
+    Create and save content for a single topic.
+
+    Args:
+        content_creator: Content creator agent
+        monitoring: Monitoring instance, or None if monitoring is disabled
+        topic: Topic to create content for
+        index: 1-based position of the topic in the run
+        total: Number of topics in the run
+        output_sink: Destination for the content
+        topic_store: Optional topic store recording which topics have been covered
+
+    Returns:
+        Created content
+    """
+    logger.info(f"Creating content for topic {index}/{total}: {topic['title']}")
+
+    if monitoring and monitoring.initialized:
+        monitoring.log_agent_action(
+            agent_name="content_creator",
+            action_type="creation_start",
+            inputs={"topic": topic['title']},
+            outputs={},
+            metadata={"timestamp": datetime.now().isoformat()}
+        )
+
+    stream = config.STREAM_CONTENT and output_sink.supports_streaming
+
+    with tracer.span("produce", topic=topic['title']):
+        if stream:
+            content = create_and_stream_content(content_creator, topic, output_sink)
+        else:
+            content = content_creator.create_content(
+                topic=topic,
+                content_type="article",
+                tone="informative",
+                target_audience="general"
+            )
+
+    if monitoring and monitoring.initialized:
+        monitoring.log_agent_action(
+            agent_name="content_creator",
+            action_type="creation_complete",
+            inputs={"topic": topic['title']},
+            outputs={"word_count": content['word_count']},
+            metadata={"timestamp": datetime.now().isoformat()}
+        )
+
+    # Save the content (already written when streaming)
+    if not stream:
+        with tracer.span("save", topic=topic['title']):
+            save_content(content, output_sink)
+
+    # Failed generations are left uncovered so that the next run retries them
+    if content.get('error'):
+        logger.warning(f"Content for {topic['title']} was not generated: {content['error']}")
+    elif topic_store:
+        topic_store.mark_generated(topic)
+
+    return content
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    Parse command line arguments.
 
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    title_slug = content['title'].lower().replace(' ', '_').replace('/', '_').replace('\\', '_')
-    filename = f"{timestamp}_{title_slug}.json"
-    filepath = os.path.join(output_dir, filename)
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
 
-    # Save content to file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(content, f, indent=2)
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Content creation multi-agent system")
+    category_group = parser.add_mutually_exclusive_group()
+    category_group.add_argument(
+        "--categories",
+        nargs="+",
+        choices=config.CONTENT_CATEGORIES,
+        metavar="CATEGORY",
+        help=f"Categories to create content for (choices: {', '.join(config.CONTENT_CATEGORIES)})"
+    )
+    category_group.add_argument(
+        "--all-categories",
+        action="store_true",
+        help="Create content for every configured category"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Only enrich and create content for topics that are new or changed since earlier runs"
+    )
+    parser.add_argument(
+        "--output-mode",
+        choices=["files", "jsonl"],
+        help="Save a JSON and a text file per article (files) or append to compressed JSONL shards with an index (jsonl)"
+    )
+    return parser.parse_args(argv)
+
+def export_trace(run_name: str, trace_dir: str = None):
+    """
+    Write the recorded spans as JSONL and log the per-stage summary.
 
-    logger.info(f"Content saved to {filepath}")
+    Args:
+        run_name: Name of the run, used for the file names
+        trace_dir: Directory to write traces to (defaults to config setting)
+    """
+    if not tracer.enabled:
+        return
 
-    # Also save a text version for easy reading
-    text_filepath = os.path.join(output_dir, f"{timestamp}_{title_slug}.txt")
-    with open(text_filepath, 'w', encoding='utf-8') as f:
-        f.write(f"Title: {content['title']}\n\n")
-        f.write(content['content'])
+    trace_dir = trace_dir or config.TRACE_DIR
+    trace_filepath = os.path.join(trace_dir, f"{run_name}.jsonl")
+    summary_filepath = os.path.join(trace_dir, f"{run_name}_summary.txt")
 
-    logger.info(f"Text version saved to {text_filepath}")
+    try:
+        tracer.export_jsonl(trace_filepath)
+        summary = tracer.format_summary()
+        with open(summary_filepath, 'w', encoding='utf-8') as f:
+            f.write(summary + "\n")
+        logger.info(f"Trace saved to {trace_filepath}\n{summary}")
+    except Exception as e:
+        logger.error(f"Failed to export trace: {e}")
 
-def main():
+def main(categories: Optional[List[str]] = None,
+         incremental: Optional[bool] = None,
+         output_mode: Optional[str] = None):
     """
     Main function to run the content creation multi-agent system.
+
+    Args:
+        categories: Categories to create content for (defaults to the first configured category)
+        incremental: Only process topics that are new or changed since earlier runs
+            (defaults to config setting)
+        output_mode: "files" or "jsonl" (defaults to config setting)
+    """
+    tracer.enabled = config.TRACE_ENABLED
+    tracer.reset()
+    run_name = f"content_creation_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    try:
+        with tracer.span("run"):
+            run_pipeline(categories, run_name, incremental=incremental, output_mode=output_mode)
+    finally:
+        export_trace(run_name)
+
+def run_pipeline(categories: Optional[List[str]],
+                 run_name: str,
+                 llm=None,
+                 output_dir: str = "output",
+                 enable_monitoring: bool = True,
+                 incremental: Optional[bool] = None,
+                 output_mode: Optional[str] = None) -> Optional[List[Optional[Dict[str, Any]]]]:
+    """
+    Search for trending topics and create content for them.
+
+    Args:
+        categories: Categories to create content for (defaults to the first configured category)
+        run_name: Name of the run, used as the monitoring session name
+        llm: Language model to use (defaults to the one built by setup_llm)
+        output_dir: Directory to save content to
+        enable_monitoring: Report the run to AgentOps
+        incremental: Only process topics that are new or changed since earlier runs
+            (defaults to config setting)
+        output_mode: "files" or "jsonl" (defaults to config setting)
+
+    Returns:
+        Created content per topic (None for topics that failed), or None if the run failed
     """
     logger.info("Starting content creation multi-agent system")
+    monitoring = None
+    output_sink = None
+    topic_store = None
 
     try:
         # Setup LLM
-        llm = setup_llm()
+        llm = llm or setup_llm()
         logger.info(f"LLM setup complete using model: {config.LLM_MODEL}")
 
         # Setup monitoring
-        monitoring = setup_monitoring()
+        monitoring = setup_monitoring() if enable_monitoring else None
         if monitoring and monitoring.initialized:
             monitoring.start_session(
-                session_name=f"content_creation_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                session_name=run_name,
                 metadata={"model": config.LLM_MODEL}
             )
 
+        # Open the topic store for incremental runs
+        if incremental is None:
+            incremental = config.INCREMENTAL_RUNS
+        topic_store = TopicStore(config.TOPIC_STORE_PATH) if incremental else None
+
+        # Setup output
+        output_sink = setup_output_sink(output_dir, output_mode)
+        if config.STREAM_CONTENT and not output_sink.supports_streaming:
+            logger.warning("STREAM_CONTENT is ignored by the selected output mode")
+
         # Initialize agents
-        trend_searcher = TrendSearcher(llm)
+        trend_searcher = TrendSearcher(llm, topic_store=topic_store)
         content_creator = ContentCreator(llm)
         logger.info("Agents initialized")
 
-        # Create CrewAI tasks
-        search_task = Task(
-            description="Search for trending topics on the internet",
-            agent=trend_searcher.agent,
-            expected_output="A list of trending topics with details",
-            async_execution=False
-        )
-
-        create_task = Task(
-            description="Create high-quality content based on trending topics",
-            agent=content_creator.agent,
-            expected_output="Engaging content articles on trending topics",
-            async_execution=False
-        )
-
         # Note: We're skipping CrewAI execution due to AgentOps integration issues
         # Instead, we'll directly use our agent implementations
 
@@ -156,77 +425,67 @@ def main():
         # Execute the process directly
         logger.info("Starting direct execution (skipping CrewAI)")
 
-        # For direct execution without CrewAI process orchestration, uncomment the following:
         # Search for trending topics
         logger.info("Starting direct trend search")
-        categories = config.CONTENT_CATEGORIES
-        selected_category = categories[0]  # Default to first category
+        selected_categories = categories or config.CONTENT_CATEGORIES[:1]  # Default to first category
 
         if monitoring and monitoring.initialized:
             monitoring.log_agent_action(
                 agent_name="trend_searcher",
                 action_type="search_start",
-                inputs={"category": selected_category},
+                inputs={"categories": selected_categories},
                 outputs={},
                 metadata={"timestamp": datetime.now().isoformat()}
             )
 
-        trending_topics = trend_searcher.search_trending_topics(
-            category=selected_category,
-            max_topics=config.MAX_TRENDING_TOPICS
-        )
+        with tracer.span("search", categories=selected_categories):
+            topics_by_category = trend_searcher.search_trending_topics_by_category(
+                categories=selected_categories,
+                max_topics=config.MAX_TRENDING_TOPICS
+            )
+
+        # Topics selected for several categories are only created once
+        trending_topics = list({
+            topic['title']: topic for topics in topics_by_category.values() for topic in topics
+        }.values())
 
         if monitoring and monitoring.initialized:
             monitoring.log_agent_action(
                 agent_name="trend_searcher",
                 action_type="search_complete",
-                inputs={"category": selected_category},
-                outputs={"topics_count": len(trending_topics)},
+                inputs={"categories": selected_categories},
+                outputs={
+                    "topics_count": len(trending_topics),
+                    "topics_per_category": {category: len(topics) for category, topics in topics_by_category.items()}
+                },
                 metadata={"timestamp": datetime.now().isoformat()}
             )
 
         logger.info(f"Found {len(trending_topics)} trending topics")
 
-        # Create content for each topic
-        for i, topic in enumerate(trending_topics):
-            logger.info(f"Creating content for topic {i+1}/{len(trending_topics)}: {topic['title']}")
-
-            if monitoring and monitoring.initialized:
-                monitoring.log_agent_action(
-                    agent_name="content_creator",
-                    action_type="creation_start",
-                    inputs={"topic": topic['title']},
-                    outputs={},
-                    metadata={"timestamp": datetime.now().isoformat()}
-                )
-
-            content = content_creator.create_content(
-                topic=topic,
-                content_type="article",
-                tone="informative",
-                target_audience="general"
-            )
-
-            if monitoring and monitoring.initialized:
-                monitoring.log_agent_action(
-                    agent_name="content_creator",
-                    action_type="creation_complete",
-                    inputs={"topic": topic['title']},
-                    outputs={"word_count": content['word_count']},
-                    metadata={"timestamp": datetime.now().isoformat()}
-                )
+        # Create content for each topic concurrently
+        scheduler = ContentScheduler(max_workers=config.CONTENT_WORKERS, max_pending=config.CONTENT_MAX_PENDING)
+        logger.info(f"Creating content for {len(trending_topics)} topics with {scheduler.max_workers} workers")
+        indexed_topics = list(enumerate(trending_topics, start=1))
+        results = scheduler.run(
+            indexed_topics,
+            tracer.bind(lambda item: produce_content(content_creator, monitoring, item[1], item[0], len(trending_topics), output_sink, topic_store))
+        )
+        failed_count = sum(1 for result in results if result is None)
+        if failed_count:
+            logger.warning(f"Content creation failed for {failed_count} of {len(trending_topics)} topics")
 
-            # Save the content
-            save_content(content)
+        log_cache_stats(llm)
 
         # End monitoring session
         if monitoring and monitoring.initialized:
             monitoring.end_session(
                 status="completed",
-                metadata={"topics_processed": len(trending_topics)}
+                metadata={"topics_processed": len(trending_topics), "categories": selected_categories}
             )
 
         logger.info("Content creation process completed successfully")
+        return results
 
     except Exception as e:
         logger.error(f"Error in content creation process: {e}", exc_info=True)
@@ -238,5 +497,17 @@ def main():
                 metadata={"error": str(e)}
             )
 
+    finally:
+        # Write out buffered shards even if the run failed
+        if output_sink:
+            output_sink.close()
+        if topic_store:
+            topic_store.close()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(
+        categories=config.CONTENT_CATEGORIES if args.all_categories else args.categories,
+        incremental=args.incremental,
+        output_mode=args.output_mode
+    )
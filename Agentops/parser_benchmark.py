@@ -0,0 +1,119 @@
+"""
+Micro-benchmark of the HTML parser backends on saved pages.
+
+Pages come from a fixture file written by `benchmark.py record` and/or a
+directory of saved .html files (files with 'trends' in their name are
+parsed as Google Trends pages, all others as search result pages):
+
+    python parser_benchmark.py --fixtures fixtures/run.json --pages saved_pages/ --iterations 50
+"""
+import os
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.html_parsing import available_backends, select_items
+from utils.replay import Fixtures
+
+TRENDS_EXTRACTION = ('.feed-item-header', {"title": ('.title', None), "description": ('.summary-text', None)}, ("title",), 10)
+SEARCH_EXTRACTION = ('.g', {"title": ('h3', None), "url": ('a', 'href'), "snippet": ('.VwiC3b', None)}, ("title", "url", "snippet"), 5)
+
+def load_pages(fixture_path: Optional[str], pages_dir: Optional[str]) -> List[Tuple[str, str, tuple]]:
+    """
+    Load the pages to benchmark.
+
+    Args:
+        fixture_path: Fixture file recorded by benchmark.py
+        pages_dir: Directory of saved .html files
+
+    Returns:
+        List of (name, html, extraction) tuples
+    """
+    pages = []
+    if fixture_path:
+        for url, html_content in Fixtures.load(fixture_path).http.items():
+            if html_content:
+                extraction = TRENDS_EXTRACTION if "google.com/trends" in url else SEARCH_EXTRACTION
+                pages.append((url, html_content, extraction))
+    if pages_dir:
+        for filename in sorted(os.listdir(pages_dir)):
+            if filename.endswith((".html", ".htm")):
+                with open(os.path.join(pages_dir, filename), 'r', encoding='utf-8', errors='replace') as f:
+                    extraction = TRENDS_EXTRACTION if "trends" in filename else SEARCH_EXTRACTION
+                    pages.append((filename, f.read(), extraction))
+    return pages
+
+def time_call(fn: Callable[[], object], iterations: int) -> float:
+    """
+    Measure the mean duration of a call.
+
+    Args:
+        fn: Function to call
+        iterations: Number of calls
+
+    Returns:
+        Mean seconds per call
+    """
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+def run(pages: List[Tuple[str, str, tuple]], iterations: int) -> List[Dict[str, object]]:
+    """
+    Benchmark every installed backend with and without early exit.
+
+    Args:
+        pages: Pages returned by load_pages()
+        iterations: Number of parses per page and mode
+
+    Returns:
+        One row per backend and mode with total time, mean time per page and
+        the number of pages whose items differ from the html.parser baseline
+    """
+    baseline = {
+        name: select_items(html_content, selector, fields, limit=limit, required=required, backend="html.parser")
+        for name, html_content, (selector, fields, required, limit) in pages
+    }
+
+    rows = []
+    for backend in available_backends():
+        for early_exit in (True, False):
+            total = 0.0
+            mismatches = 0
+            for name, html_content, (selector, fields, required, limit) in pages:
+                page_limit = limit if early_exit else None
+                total += time_call(
+                    lambda: select_items(html_content, selector, fields, limit=page_limit, required=required, backend=backend),
+                    iterations
+                )
+                if early_exit and select_items(html_content, selector, fields, limit=limit,
+                                               required=required, backend=backend) != baseline[name]:
+                    mismatches += 1
+            rows.append({
+                "backend": backend,
+                "early_exit": early_exit,
+                "total_ms": total * 1000,
+                "per_page_ms": total * 1000 / len(pages),
+                "mismatches": mismatches if early_exit else None,
+            })
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on saved pages")
+    parser.add_argument("--fixtures", help="Fixture file recorded by benchmark.py")
+    parser.add_argument("--pages", help="Directory of saved .html pages")
+    parser.add_argument("--iterations", type=int, default=20, help="Parses per page and mode")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures, args.pages)
+    if not pages:
+        parser.error("no pages found; pass --fixtures and/or --pages")
+
+    total_kb = sum(len(html_content) for _, html_content, _ in pages) / 1024
+    print(f"{len(pages)} pages ({total_kb:.0f} KB), {args.iterations} iterations each\n")
+    print(f"{'backend':<12} {'early exit':>10} {'total ms':>10} {'ms/page':>10} {'mismatches':>10}")
+    for row in run(pages, args.iterations):
+        mismatches = "-" if row["mismatches"] is None else row["mismatches"]
+        print(f"{row['backend']:<12} {'yes' if row['early_exit'] else 'no':>10} "
+              f"{row['total_ms']:>10.2f} {row['per_page_ms']:>10.3f} {mismatches:>10}")
@@ -0,0 +1,138 @@
+"""
+Tests for the on-disk HTTP cache against a local HTTP server.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import config
+from utils import web_utils
+from utils.http_cache import HttpCache
+
+class PageHandler(BaseHTTPRequestHandler):
+    """
+    Serves one page whose body, ETag and status the test controls.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.status != 200:
+            self.send_response(server.status)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+        body = server.body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    httpd.requests = []
+    httpd.status = 200
+    httpd.body = "<html>v1</html>"
+    httpd.etag = '"v1"'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/page"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """
+    Route fetch_webpage through a fresh cache that revalidates on every request.
+    """
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "HTTP_CACHE_DIR", str(tmp_path / "http_cache"))
+    monkeypatch.setattr(config, "HTTP_CACHE_TTL", 0)
+    monkeypatch.setattr(web_utils, "_http_cache", None)
+    return web_utils.get_http_cache()
+
+def test_fresh_entry_is_served_without_a_request(server, cache):
+    cache.ttl = 3600
+
+    assert web_utils.fetch_webpage(server.url) == "<html>v1</html>"
+    assert web_utils.fetch_webpage(server.url) == "<html>v1</html>"
+
+    assert len(server.requests) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_expired_entry_is_revalidated_with_etag(server, cache):
+    web_utils.fetch_webpage(server.url)
+
+    assert web_utils.fetch_webpage(server.url) == "<html>v1</html>"
+
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert cache.stats() == {"hits": 0, "revalidated": 1, "stale": 0, "misses": 1}
+
+def test_changed_page_replaces_the_cached_body(server, cache):
+    web_utils.fetch_webpage(server.url)
+    server.body = "<html>v2</html>"
+    server.etag = '"v2"'
+
+    assert web_utils.fetch_webpage(server.url) == "<html>v2</html>"
+    assert cache.get(server.url)["etag"] == '"v2"'
+
+def test_stale_entry_is_served_on_server_error(server, cache):
+    web_utils.fetch_webpage(server.url)
+    server.status = 503
+
+    assert web_utils.fetch_webpage(server.url) == "<html>v1</html>"
+    assert cache.stats()["stale"] == 1
+
+def test_stale_entry_is_served_when_the_server_is_down(server, cache):
+    web_utils.fetch_webpage(server.url)
+    server.shutdown()
+    server.server_close()
+
+    assert web_utils.fetch_webpage(server.url, timeout=2) == "<html>v1</html>"
+    assert cache.stats()["stale"] == 1
+
+def test_stale_entry_is_not_served_on_client_error(server, cache):
+    web_utils.fetch_webpage(server.url)
+    server.status = 404
+
+    assert web_utils.fetch_webpage(server.url) == ""
+    assert cache.stats()["stale"] == 0
+
+def test_stores_evict_least_recently_used_entries(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60, max_bytes=2000, evict_every=5)
+    body = "x" * 300
+    started = time.time() - 100
+
+    for i in range(20):
+        cache.store(f"http://example.com/{i}", body)
+        # Space out the last-used times so the eviction order is deterministic
+        os.utime(cache._path_for(f"http://example.com/{i}"), (started + i, started + i))
+
+    entries = [name for name in os.listdir(tmp_path) if name.endswith(".json")]
+    assert sum(os.path.getsize(tmp_path / name) for name in entries) <= 2000
+    assert cache.get("http://example.com/19") is not None
+    assert cache.get("http://example.com/0") is None
+
+def test_stores_evict_entries_unused_for_max_age(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl=60, max_age=3600, evict_every=2)
+    cache.store("http://example.com/old", "old")
+    old = time.time() - 7200
+    os.utime(cache._path_for("http://example.com/old"), (old, old))
+
+    cache.store("http://example.com/new", "new")
+
+    assert cache.get("http://example.com/old") is None
+    assert cache.get("http://example.com/new")["body"] == "new"
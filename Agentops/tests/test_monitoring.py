@@ -0,0 +1,169 @@
+"""
+Tests for the buffered monitoring event exporter.
+"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("agentops")
+
+from utils import monitoring
+from utils.monitoring import AgentOpsMonitoring, BufferedEventExporter
+
+class StubSink:
+    """
+    Records exported events and can hold the worker inside the sink.
+    """
+
+    def __init__(self, fail_on=None):
+        self.events = []
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail_on = fail_on
+
+    def __call__(self, event):
+        self.entered.set()
+        self.gate.wait(5)
+        if event == self.fail_on:
+            raise RuntimeError("backend unavailable")
+        self.events.append(event)
+
+    def hold(self):
+        self.entered.clear()
+        self.gate.clear()
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_full_batch_is_flushed_before_the_interval():
+    sink = StubSink()
+    exporter = BufferedEventExporter(sink, batch_size=5, flush_interval=60)
+
+    for i in range(5):
+        exporter.submit(i)
+
+    assert wait_for(lambda: len(sink.events) == 5, timeout=2)
+    assert exporter.drain(5)
+
+def test_partial_batch_is_flushed_after_the_interval():
+    sink = StubSink()
+    exporter = BufferedEventExporter(sink, batch_size=50, flush_interval=0.1)
+
+    exporter.submit("event")
+
+    assert wait_for(lambda: sink.events == ["event"], timeout=2)
+    assert exporter.drain(5)
+
+def test_worker_takes_at_most_batch_size_events_per_flush():
+    sink = StubSink()
+    sink.hold()
+    exporter = BufferedEventExporter(sink, batch_size=5, flush_interval=60)
+
+    for i in range(12):
+        exporter.submit(i)
+    assert sink.entered.wait(2)
+
+    assert exporter.stats()["queued"] == 7
+    sink.gate.set()
+    assert exporter.drain(5)
+    assert sink.events == list(range(12))
+
+def test_drop_oldest_discards_the_oldest_queued_events():
+    sink = StubSink()
+    sink.hold()
+    exporter = BufferedEventExporter(sink, max_queue_size=3, batch_size=1, flush_interval=60,
+                                     overflow_policy="drop_oldest")
+
+    exporter.submit(0)
+    assert sink.entered.wait(2)
+    for i in range(1, 6):
+        exporter.submit(i)
+
+    assert exporter.stats()["dropped"] == 2
+    sink.gate.set()
+    assert exporter.drain(5)
+    assert sink.events == [0, 3, 4, 5]
+
+def test_block_waits_for_room_without_dropping():
+    sink = StubSink()
+    sink.hold()
+    exporter = BufferedEventExporter(sink, max_queue_size=2, batch_size=1, flush_interval=60,
+                                     overflow_policy="block")
+
+    exporter.submit(0)
+    assert sink.entered.wait(2)
+    exporter.submit(1)
+    exporter.submit(2)
+    producer = threading.Thread(target=exporter.submit, args=(3,))
+    producer.start()
+
+    producer.join(0.2)
+    assert producer.is_alive()
+    sink.gate.set()
+    producer.join(2)
+    assert not producer.is_alive()
+    assert exporter.drain(5)
+    assert sink.events == [0, 1, 2, 3]
+    assert exporter.stats()["dropped"] == 0
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BufferedEventExporter(StubSink(), overflow_policy="drop_newest")
+
+def test_drain_exports_queued_events_and_stops_the_worker():
+    sink = StubSink()
+    exporter = BufferedEventExporter(sink, batch_size=100, flush_interval=60)
+
+    for i in range(10):
+        exporter.submit(i)
+
+    assert exporter.drain(5)
+    assert sink.events == list(range(10))
+    assert not exporter._worker.is_alive()
+    assert exporter.stats() == {"submitted": 10, "exported": 10, "failed": 0, "dropped": 0, "queued": 0}
+
+def test_drain_times_out_on_a_stuck_sink():
+    sink = StubSink()
+    sink.hold()
+    exporter = BufferedEventExporter(sink, batch_size=1, flush_interval=60)
+
+    exporter.submit(0)
+    exporter.submit(1)
+    assert sink.entered.wait(2)
+
+    assert not exporter.drain(0.2)
+    sink.gate.set()
+    assert exporter.drain(5)
+
+def test_sink_errors_are_counted_and_do_not_stop_the_worker():
+    sink = StubSink(fail_on=1)
+    exporter = BufferedEventExporter(sink, batch_size=10, flush_interval=60)
+
+    for i in range(3):
+        exporter.submit(i)
+
+    assert exporter.drain(5)
+    assert sink.events == [0, 2]
+    assert exporter.stats()["failed"] == 1
+
+def test_end_session_drains_buffered_actions_first(monkeypatch):
+    calls = []
+    monkeypatch.setattr(monitoring.agentops, "init", lambda **kwargs: None)
+    monkeypatch.setattr(monitoring.agentops, "start_session", lambda **kwargs: object())
+    monkeypatch.setattr(monitoring.agentops, "end_session", lambda **kwargs: calls.append("end_session"))
+    monitor = AgentOpsMonitoring("test-key", sink=lambda event: calls.append(event["action_type"]),
+                                 flush_interval=60)
+
+    monitor.start_session("test")
+    for action in ("search", "enrich", "write"):
+        monitor.log_agent_action("agent", action, {}, {})
+    monitor.end_session()
+
+    assert calls == ["search", "enrich", "write", "end_session"]
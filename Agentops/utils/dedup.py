@@ -0,0 +1,269 @@
+"""
+Near-duplicate detection for trending topics.
+
+Topics are compared on the words of their title and description. MinHash
+signatures with locality-sensitive hashing find candidate pairs without
+comparing every topic with every other one, and candidates are confirmed
+with their exact Jaccard similarity. When a local sentence embedding model
+is configured and sentence-transformers is installed, topics whose
+embeddings are close enough are clustered as well.
+"""
+import hashlib
+import logging
+import random
+import re
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Words that carry no topical meaning and would inflate similarity
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "new", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with"
+}
+
+# Signature positions per LSH band; with 64 permutations this gives 16 bands,
+# so pairs with a Jaccard similarity of about 0.5 or more become candidates
+ROWS_PER_BAND = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def topic_shingles(topic: Dict[str, Any]) -> Set[str]:
+    """
+    Get the set of normalized words describing a topic.
+
+    Args:
+        topic: Topic information with title and description
+
+    Returns:
+        Lowercase words of the title and description without stopwords,
+        with a plural 's' removed
+    """
+    text = f"{topic.get('title', '')} {topic.get('description', '')}".lower()
+    shingles = set()
+    for word in re.findall(r"\w+", text):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        shingles.add(word)
+    return shingles
+
+def jaccard_similarity(first: Set[str], second: Set[str]) -> float:
+    """
+    Compute the Jaccard similarity of two sets.
+
+    Args:
+        first: First set
+        second: Second set
+
+    Returns:
+        Size of the intersection divided by the size of the union (0 for two empty sets)
+    """
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+class MinHasher:
+    """
+    Computes MinHash signatures of sets of strings.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        Initialize the hash permutations.
+
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            seed: Seed for the permutation parameters, fixed so signatures are reproducible
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a set.
+
+        Args:
+            shingles: Elements of the set
+
+        Returns:
+            Minimum permuted hash per permutation
+        """
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for shingle in shingles
+        ]
+        if not hashes:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._permutations
+        )
+
+def _candidate_pairs(signatures: List[Tuple[int, ...]], rows_per_band: int) -> Set[Tuple[int, int]]:
+    """
+    Find pairs of signatures sharing at least one LSH band.
+
+    Args:
+        signatures: MinHash signatures
+        rows_per_band: Number of signature positions per band
+
+    Returns:
+        Index pairs (i, j) with i < j
+    """
+    pairs = set()
+    num_perm = len(signatures[0]) if signatures else 0
+    for start in range(0, num_perm, rows_per_band):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for index, signature in enumerate(signatures):
+            buckets.setdefault(signature[start:start + rows_per_band], []).append(index)
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    pairs.add((first, second))
+    return pairs
+
+def _embedding_pairs(topics: List[Dict[str, Any]], model_name: str, threshold: float) -> Set[Tuple[int, int]]:
+    """
+    Find pairs of topics whose sentence embeddings are similar.
+
+    Args:
+        topics: Topics to compare
+        model_name: sentence-transformers model to load
+        threshold: Minimum cosine similarity
+
+    Returns:
+        Index pairs (i, j) with i < j, or an empty set if sentence-transformers is not installed
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers is not installed, skipping embedding-based deduplication")
+        return set()
+
+    try:
+        model = _load_embedding_model(SentenceTransformer, model_name)
+        texts = [f"{topic.get('title', '')}. {topic.get('description', '')}" for topic in topics]
+        embeddings = model.encode(texts, normalize_embeddings=True)
+        similarities = embeddings @ embeddings.T
+    except Exception as e:
+        logger.error(f"Error computing topic embeddings: {e}")
+        return set()
+
+    return {
+        (i, j)
+        for i in range(len(topics))
+        for j in range(i + 1, len(topics))
+        if similarities[i][j] >= threshold
+    }
+
+_embedding_models: Dict[str, Any] = {}
+
+def _load_embedding_model(model_class, model_name: str):
+    """
+    Load a sentence embedding model once per process.
+
+    Args:
+        model_class: SentenceTransformer class
+        model_name: Model to load
+
+    Returns:
+        Loaded model
+    """
+    if model_name not in _embedding_models:
+        _embedding_models[model_name] = model_class(model_name)
+    return _embedding_models[model_name]
+
+def cluster_near_duplicates(topics: List[Dict[str, Any]],
+                            threshold: float = 0.5,
+                            num_perm: int = 64,
+                            embedding_model: Optional[str] = None,
+                            embedding_threshold: float = 0.85) -> List[List[int]]:
+    """
+    Group topics that describe the same story.
+
+    Args:
+        topics: Topics to cluster
+        threshold: Minimum Jaccard similarity of the topic words
+        num_perm: Number of MinHash permutations
+        embedding_model: Optional sentence-transformers model for semantic matching
+        embedding_threshold: Minimum cosine similarity of the embeddings
+
+    Returns:
+        Clusters as lists of topic indices, each sorted and ordered by their first index
+    """
+    shingles = [topic_shingles(topic) for topic in topics]
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(topic_shingle) for topic_shingle in shingles]
+
+    pairs = {
+        (i, j) for i, j in _candidate_pairs(signatures, ROWS_PER_BAND)
+        if jaccard_similarity(shingles[i], shingles[j]) >= threshold
+    }
+    if embedding_model:
+        pairs |= _embedding_pairs(topics, embedding_model, embedding_threshold)
+
+    # Union-find over the duplicate pairs
+    parents = list(range(len(topics)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(topics)):
+        clusters.setdefault(find(index), []).append(index)
+    return sorted(clusters.values(), key=lambda cluster: cluster[0])
+
+def collapse_near_duplicates(topics: List[Dict[str, Any]],
+                             threshold: float = 0.5,
+                             num_perm: int = 64,
+                             embedding_model: Optional[str] = None,
+                             embedding_threshold: float = 0.85) -> List[Dict[str, Any]]:
+    """
+    Keep one representative topic per cluster of near-duplicates.
+
+    The first topic of each cluster in source order is kept, and the titles
+    of the topics it replaces are listed under 'duplicate_titles'.
+
+    Args:
+        topics: Topics to deduplicate
+        threshold: Minimum Jaccard similarity of the topic words
+        num_perm: Number of MinHash permutations
+        embedding_model: Optional sentence-transformers model for semantic matching
+        embedding_threshold: Minimum cosine similarity of the embeddings
+
+    Returns:
+        Representative topics in source order
+    """
+    if len(topics) < 2:
+        return topics
+
+    clusters = cluster_near_duplicates(topics, threshold, num_perm, embedding_model, embedding_threshold)
+
+    representatives = []
+    for cluster in clusters:
+        representative = topics[cluster[0]]
+        if len(cluster) > 1:
+            duplicate_titles = [topics[index]['title'] for index in cluster[1:]]
+            logger.info(f"Collapsed {len(duplicate_titles)} near-duplicates into '{representative['title']}': "
+                        f"{', '.join(duplicate_titles)}")
+            representative = {**representative, "duplicate_titles": duplicate_titles}
+        representatives.append(representative)
+
+    logger.info(f"Deduplication kept {len(representatives)} of {len(topics)} topics")
+    return representatives
@@ -0,0 +1,155 @@
+"""
+HTML extraction helpers with pluggable parser backends.
+
+The fastest installed backend is used by default: selectolax, then
+BeautifulSoup with lxml, then BeautifulSoup with Python's html.parser.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        # selectolax < 0.3.13 only ships the Modest backend
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only checked for availability, used through BeautifulSoup)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+# A field is extracted from the first node matching a CSS selector, either as
+# its text (attribute None) or as the value of the given attribute.
+FieldSpec = Tuple[str, Optional[str]]
+
+def available_backends() -> List[str]:
+    """
+    List the parser backends installed in this environment.
+    
+    Returns:
+        Backend names, fastest first
+    """
+    backends = []
+    if HTMLParser is not None:
+        backends.append("selectolax")
+    if LXML_AVAILABLE:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+def get_backend(backend: str = None) -> str:
+    """
+    Resolve the parser backend to use.
+    
+    Args:
+        backend: Requested backend, or 'auto' / None for the configured or fastest one
+        
+    Returns:
+        Name of an installed backend
+    """
+    backend = backend or config.HTML_PARSER
+    installed = available_backends()
+    if backend == "auto":
+        return installed[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    if backend not in installed:
+        logger.warning(f"HTML parser backend {backend} is not installed, using {installed[0]}")
+        return installed[0]
+    return backend
+
+def select_items(html_content: str,
+                 item_selector: str,
+                 fields: Dict[str, FieldSpec],
+                 limit: Optional[int] = None,
+                 required: Tuple[str, ...] = (),
+                 backend: str = None) -> List[Dict[str, Optional[str]]]:
+    """
+    Extract structured items from HTML using CSS selectors.
+    
+    Only the first `limit` item nodes have their fields extracted. The
+    BeautifulSoup backends also stop matching at `limit`; selectolax has no
+    early exit and matches the whole document before the list is sliced.
+    
+    Args:
+        html_content: HTML to parse
+        item_selector: CSS selector of the nodes that make up one item each
+        fields: Mapping of field names to (CSS selector, attribute) inside an item
+        limit: Maximum number of item nodes to consider
+        required: Fields whose selector must match for an item to be included
+        backend: Parser backend (defaults to config setting)
+        
+    Returns:
+        List of items mapping field names to stripped text/attribute values
+        (None when a field is missing)
+    """
+    if not html_content:
+        return []
+
+    backend = get_backend(backend)
+    if backend == "selectolax":
+        items = _select_with_selectolax(html_content, item_selector, fields, limit)
+    else:
+        items = _select_with_beautifulsoup(html_content, item_selector, fields, limit, backend)
+
+    return [item for item in items if all(item.get(name) is not None for name in required)]
+
+def _select_with_selectolax(html_content: str,
+                            item_selector: str,
+                            fields: Dict[str, FieldSpec],
+                            limit: Optional[int]) -> List[Dict[str, Optional[str]]]:
+    tree = HTMLParser(html_content)
+    # css() has no early exit, so every match is collected before slicing
+    nodes = tree.css(item_selector)
+    if limit is not None:
+        nodes = nodes[:limit]
+
+    items = []
+    for node in nodes:
+        item = {}
+        for name, (selector, attribute) in fields.items():
+            match = node.css_first(selector)
+            if match is None:
+                item[name] = None
+            elif attribute:
+                value = match.attributes.get(attribute)
+                item[name] = value.strip() if value else ""
+            else:
+                item[name] = match.text().strip()
+        items.append(item)
+    return items
+
+def _select_with_beautifulsoup(html_content: str,
+                               item_selector: str,
+                               fields: Dict[str, FieldSpec],
+                               limit: Optional[int],
+                               features: str) -> List[Dict[str, Optional[str]]]:
+    soup = BeautifulSoup(html_content, features)
+    # soupsieve stops matching once the limit is reached (0 means no limit)
+    nodes = soup.select(item_selector, limit=limit or 0)
+
+    items = []
+    for node in nodes:
+        item = {}
+        for name, (selector, attribute) in fields.items():
+            match = node.select_one(selector)
+            if match is None:
+                item[name] = None
+            elif attribute:
+                item[name] = (match.get(attribute) or "").strip()
+            else:
+                item[name] = match.get_text().strip()
+        items.append(item)
+    return items
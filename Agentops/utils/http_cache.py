@@ -0,0 +1,233 @@
+"""
+On-disk HTTP response cache honoring ETag and Last-Modified validators.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class HttpCache:
+    """
+    File-based cache of HTTP response bodies.
+    
+    Entries younger than the TTL are served without touching the network.
+    Older entries are revalidated with a conditional GET using the stored
+    ETag / Last-Modified values. Entries unused for max_age seconds are
+    removed, then least recently used entries while the cache exceeds
+    max_bytes. Eviction runs on startup and after every evict_every writes,
+    so a long run cannot grow the cache without bound.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 ttl: float,
+                 max_age: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 evict_every: int = 50):
+        """
+        Initialize the HTTP cache and evict entries beyond the limits.
+
+        Args:
+            cache_dir: Directory where cached responses are stored
+            ttl: Number of seconds a cached response is served without revalidation
+            max_age: Number of seconds an unused entry is kept (None keeps entries forever)
+            max_bytes: Maximum total size of the cache directory in bytes (None for no limit)
+            evict_every: Number of entry writes between eviction passes
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidated": 0, "stale": 0, "misses": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict()
+
+    def _path_for(self, url: str) -> str:
+        """
+        Get the file path of the cache entry for a URL.
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Path of the cache entry file
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the cache entry for a URL.
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Cache entry with body, etag, last_modified and fetched_at, or None
+        """
+        path = self._path_for(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # The modification time tracks the last use for eviction
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Discarding unreadable cache entry for {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        Check whether a cache entry can be served without revalidation.
+
+        Args:
+            entry: Cache entry returned by get()
+
+        Returns:
+            True if the entry is younger than the TTL
+        """
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Build conditional request headers for revalidating an entry.
+
+        Args:
+            entry: Cache entry returned by get()
+
+        Returns:
+            Dictionary of If-None-Match / If-Modified-Since headers
+        """
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Store a response body in the cache.
+
+        Args:
+            url: Requested URL
+            body: Response body
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+        """
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        self._write_entry(url, entry)
+
+    def refresh(self, url: str, entry: Dict[str, Any]) -> None:
+        """
+        Mark a revalidated entry as fresh again.
+
+        Args:
+            url: Requested URL
+            entry: Cache entry that the server confirmed as unchanged
+        """
+        self._write_entry(url, {**entry, "fetched_at": time.time()})
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        """
+        Atomically write a cache entry to disk, evicting old entries every
+        evict_every writes.
+
+        Args:
+            url: Requested URL
+            entry: Cache entry to write
+        """
+        path = self._path_for(url)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry for {url}: {e}")
+            return
+
+        with self._lock:
+            self._writes_since_evict += 1
+            due = self._writes_since_evict >= self.evict_every
+            if due:
+                self._writes_since_evict = 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove entries unused for longer than max_age, then least recently used
+        entries until the cache fits in max_bytes.
+        """
+        now = time.time()
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            # Skip temporary files that another thread is still writing
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        evicted = 0
+        for last_used, size, path in entries:
+            too_old = self.max_age is not None and now - last_used > self.max_age
+            too_big = self.max_bytes is not None and total_size > self.max_bytes
+            if not (too_old or too_big):
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to evict cache entry {path}: {e}")
+                continue
+            total_size -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} HTTP cache entries")
+
+    def record(self, outcome: str) -> None:
+        """
+        Count a cache lookup outcome.
+
+        Args:
+            outcome: One of 'hits', 'revalidated', 'stale' or 'misses'
+        """
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache hit/miss counters.
+
+        Returns:
+            Dictionary with hits, revalidated, stale and misses counts
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,325 @@
+"""
+Persistent LLM response cache backed by SQLite.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class CachedResponse:
+    """
+    Minimal stand-in for an LLM message returned from the cache.
+    """
+
+    def __init__(self, content: str):
+        """
+        Initialize the cached response.
+
+        Args:
+            content: Cached response text
+        """
+        self.content = content
+        self.response_metadata = {"cached": True}
+
+class LLMResponseCache:
+    """
+    SQLite store of LLM responses with TTL and LRU eviction.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int, max_bytes: int):
+        """
+        Initialize the response cache.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl: Number of seconds a response stays valid
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses in bytes
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses (last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: Optional[float], options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the cache key for a prompt.
+
+        Whitespace in the prompt is normalized so that indentation changes in
+        prompt templates do not invalidate the cache.
+
+        Args:
+            model: Model name
+            prompt: Prompt text
+            temperature: Sampling temperature
+            options: Other request parameters that affect the response, such as
+                stop sequences or bound model arguments
+
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized_prompt = " ".join(str(prompt).split())
+        key_parts = [model, normalized_prompt, temperature]
+        if options:
+            key_parts.append(options)
+        payload = json.dumps(key_parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response and evict entries beyond the configured limits.
+
+        Args:
+            key: Cache key from make_key()
+            model: Model name
+            response: Response text
+        """
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a cached response.
+
+        Args:
+            key: Cache key from make_key()
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """
+        Remove expired entries, then least recently used entries over the limits.
+
+        Must be called with the lock held.
+
+        Args:
+            now: Current time
+        """
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+
+        count, total_size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_accessed ASC").fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total_size -= size
+            evicted += 1
+
+        logger.debug(f"Evicted {evicted} LLM cache entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit-rate metrics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and bytes
+        """
+        with self._lock:
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": total_size,
+            }
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+def invalidate_cached_response(llm, prompt, *args, **kwargs) -> None:
+    """
+    Drop the cached response of a call when the response turned out to be unusable.
+
+    Does nothing when the LLM is not wrapped in a CachedLLM.
+
+    Args:
+        llm: LLM the call was made with, possibly wrapped in other wrappers
+        prompt: Prompt of the call, followed by the same arguments it was made with
+    """
+    invalidate = getattr(llm, "invalidate", None)
+    if callable(invalidate):
+        invalidate(prompt, *args, **kwargs)
+
+class CachedLLM:
+    """
+    Wrapper around a LangChain chat model that serves repeated prompts from a cache.
+
+    Attributes not defined here are forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm, cache: LLMResponseCache, model_name: str = None, temperature: float = None):
+        """
+        Initialize the cached LLM.
+
+        Args:
+            llm: Language model to wrap
+            cache: Response cache
+            model_name: Model name used in cache keys (defaults to the model's model_name)
+            temperature: Temperature used in cache keys (defaults to the model's temperature)
+        """
+        self.llm = llm
+        self.cache = cache
+        self.model_name = model_name or getattr(llm, "model_name", type(llm).__name__)
+        self.temperature = temperature if temperature is not None else getattr(llm, "temperature", None)
+
+        # Arguments bound to the model (RunnableBinding.kwargs, model_kwargs) change its responses
+        self.bound_options = {}
+        for name in ("kwargs", "model_kwargs"):
+            value = getattr(llm, name, None)
+            if isinstance(value, dict) and value:
+                self.bound_options[name] = value
+
+    def _make_key(self, prompt, args, kwargs) -> str:
+        """
+        Build the cache key of a call.
+
+        Args:
+            prompt: Prompt sent to the model
+            args: Extra positional arguments of the call
+            kwargs: Extra keyword arguments of the call
+
+        Returns:
+            Cache key
+        """
+        options = dict(self.bound_options)
+        if args:
+            options["args"] = list(args)
+        if kwargs:
+            options["call_kwargs"] = kwargs
+        return self.cache.make_key(self.model_name, prompt, self.temperature, options)
+
+    def invoke(self, prompt, *args, **kwargs):
+        """
+        Invoke the model, using the cached response when available.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Returns:
+            Model response message
+        """
+        key = self._make_key(prompt, args, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return CachedResponse(cached)
+
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self.cache.put(key, self.model_name, response.content)
+        return response
+
+    def stream(self, prompt, *args, **kwargs) -> Iterator[Any]:
+        """
+        Stream the model response, replaying the cached response when available.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Yields:
+            Response message chunks
+        """
+        key = self._make_key(prompt, args, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield CachedResponse(cached)
+            return
+
+        parts = []
+        for chunk in self.llm.stream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.cache.put(key, self.model_name, "".join(parts))
+
+    def invalidate(self, prompt, *args, **kwargs) -> None:
+        """
+        Drop the cached response of a call, so that the next identical call asks the model again.
+
+        Args:
+            prompt: Prompt of the call, followed by the same arguments it was made with
+        """
+        self.cache.delete(self._make_key(prompt, args, kwargs))
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
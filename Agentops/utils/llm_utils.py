@@ -0,0 +1,87 @@
+"""
+Helper functions for building LLM prompts and parsing LLM responses.
+"""
+import json
+import logging
+from typing import Any, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text with LLaMA tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Approximate token count
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def chunk_by_token_budget(items: List[str], token_budget: int) -> List[List[int]]:
+    """
+    Group items into chunks whose estimated token count fits a budget.
+    
+    An item larger than the budget on its own is placed in a chunk by itself.
+    
+    Args:
+        items: Texts to group
+        token_budget: Maximum estimated tokens per chunk
+        
+    Returns:
+        List of chunks, each a list of indexes into items
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    
+    for index, item in enumerate(items):
+        item_tokens = estimate_tokens(item)
+        if current and current_tokens + item_tokens > token_budget:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += item_tokens
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+def extract_json(text: str) -> Optional[Any]:
+    """
+    Extract the first JSON object or array from an LLM response.
+    
+    Handles responses wrapped in markdown code fences or surrounded by prose.
+    
+    Args:
+        text: Raw LLM response
+        
+    Returns:
+        Parsed JSON value, or None if no valid JSON could be found
+    """
+    # Try whichever bracket type opens first, so arrays of objects stay intact
+    candidates = sorted(
+        (text.find(opener), opener, closer)
+        for opener, closer in (('{', '}'), ('[', ']'))
+        if opener in text
+    )
+    
+    for start, opener, closer in candidates:
+        end = text.rfind(closer)
+        if end <= start:
+            continue
+        try:
+            return json.loads(text[start:end + 1], strict=False)
+        except json.JSONDecodeError:
+            continue
+    
+    logger.debug("No JSON found in LLM response")
+    return None
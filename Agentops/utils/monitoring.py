@@ -3,29 +3,201 @@ Monitoring utilities using AgentOps.
 """
 import agentops
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class BufferedEventExporter:
+    """
+    Exports monitoring events from a background thread.
+
+    Events are put in a bounded in-memory queue and a worker thread hands them
+    to the sink in batches, so callers never wait on the monitoring backend.
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "block")
+
+    def __init__(self,
+                 sink: Callable[[Dict[str, Any]], None],
+                 max_queue_size: int = 1000,
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 overflow_policy: str = "drop_oldest"):
+        """
+        Initialize the exporter.
+
+        Args:
+            sink: Function called with each event from the worker thread
+            max_queue_size: Maximum number of events waiting to be exported
+            batch_size: Maximum number of events exported per flush
+            flush_interval: Maximum seconds an event waits before being flushed
+            overflow_policy: What to do when the queue is full: 'drop_oldest' or 'block'
+        """
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.sink = sink
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+
+        self._queue = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._worker = None
+        self._stopping = False
+        self._stats = {"submitted": 0, "exported": 0, "failed": 0, "dropped": 0}
+
+    def submit(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event for export.
+
+        Args:
+            event: Event to export
+        """
+        with self._condition:
+            self._ensure_worker()
+
+            while len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == "drop_oldest":
+                    self._queue.popleft()
+                    self._stats["dropped"] += 1
+                else:
+                    self._condition.wait()
+
+            self._queue.append(event)
+            self._stats["submitted"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Export all queued events and stop the worker thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to empty
+
+        Returns:
+            True if every queued event was exported before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Timed out draining monitoring events, {len(self._queue)} left unexported")
+                    return False
+                self._condition.wait(remaining)
+            worker = self._worker
+
+        if worker:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get exporter counters.
+
+        Returns:
+            Dictionary with submitted, exported, failed, dropped and queued counts
+        """
+        with self._condition:
+            return {**self._stats, "queued": len(self._queue)}
+
+    def _ensure_worker(self) -> None:
+        """
+        Start the worker thread if it is not running. Must be called with the lock held.
+        """
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="agentops-exporter", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        """
+        Worker loop flushing batches of events to the sink.
+        """
+        while True:
+            with self._condition:
+                if not self._queue and not self._stopping:
+                    self._condition.wait(self.flush_interval)
+                if not self._queue:
+                    if self._stopping:
+                        self._condition.notify_all()
+                        return
+                    continue
+
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                # Wake producers blocked on a full queue
+                self._condition.notify_all()
+
+            exported = 0
+            for event in batch:
+                try:
+                    self.sink(event)
+                    exported += 1
+                except Exception as e:
+                    logger.error(f"Failed to export monitoring event: {e}")
+
+            with self._condition:
+                self._in_flight = 0
+                self._stats["exported"] += exported
+                self._stats["failed"] += len(batch) - exported
+                self._condition.notify_all()
+
 class AgentOpsMonitoring:
     """
     Class to handle AgentOps monitoring for the multi-agent system.
     """
 
-    def __init__(self, api_key: str, project_name: str = "content_creation_agents"):
+    def __init__(self,
+                 api_key: str,
+                 project_name: str = "content_creation_agents",
+                 buffered: bool = True,
+                 sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_queue_size: int = 1000,
+                 batch_size: int = 50,
+                 flush_interval: float = 1.0,
+                 overflow_policy: str = "drop_oldest",
+                 drain_timeout: float = 10.0):
         """
         Initialize AgentOps monitoring.
 
         Args:
             api_key: AgentOps API key
             project_name: Name of the project in AgentOps
+            buffered: Export agent actions from a background thread instead of the calling thread
+            sink: Function receiving each agent action (defaults to agentops.log_agent_action)
+            max_queue_size: Maximum number of buffered agent actions
+            batch_size: Maximum number of agent actions exported per flush
+            flush_interval: Maximum seconds an agent action stays buffered
+            overflow_policy: What to do when the buffer is full: 'drop_oldest' or 'block'
+            drain_timeout: Maximum seconds end_session waits for buffered actions to be exported
         """
         self.api_key = api_key
         self.project_name = project_name
         self.session = None
         self.initialized = False
+        self.sink = sink or self._send_agent_action
+        self.drain_timeout = drain_timeout
+        self.exporter = None
+        if buffered:
+            self.exporter = BufferedEventExporter(
+                sink=self.sink,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy
+            )
 
         try:
             # Check if API key is a placeholder
@@ -82,18 +254,33 @@ class AgentOpsMonitoring:
             logger.warning("AgentOps not initialized, skipping action logging")
             return
 
+        event = {
+            "agent_name": agent_name,
+            "action_type": action_type,
+            "inputs": inputs,
+            "outputs": outputs,
+            "metadata": metadata or {}
+        }
+
+        if self.exporter:
+            self.exporter.submit(event)
+            return
+
         try:
-            agentops.log_agent_action(
-                agent_name=agent_name,
-                action_type=action_type,
-                inputs=inputs,
-                outputs=outputs,
-                metadata=metadata or {}
-            )
-            logger.debug(f"Logged action for agent {agent_name}: {action_type}")
+            self.sink(event)
         except Exception as e:
             logger.error(f"Failed to log agent action: {e}")
 
+    def _send_agent_action(self, event: Dict[str, Any]) -> None:
+        """
+        Send an agent action to AgentOps.
+
+        Args:
+            event: Agent action with agent_name, action_type, inputs, outputs and metadata
+        """
+        agentops.log_agent_action(**event)
+        logger.debug(f"Logged action for agent {event['agent_name']}: {event['action_type']}")
+
     def end_session(self, status: str = "completed", metadata: Optional[Dict[str, Any]] = None) -> None:
         """
         End the current monitoring session.
@@ -106,6 +293,10 @@ class AgentOpsMonitoring:
             logger.warning("No active AgentOps session to end")
             return
 
+        if self.exporter:
+            self.exporter.drain(self.drain_timeout)
+            logger.info(f"Monitoring exporter stats: {self.exporter.stats()}")
+
         try:
             agentops.end_session(
                 status=status,
@@ -0,0 +1,565 @@
+"""
+Utilities for writing generated content to the output directory.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def build_output_paths(title: str, output_dir: str = "output") -> Tuple[str, str]:
+    """
+    Build the JSON and text file paths for a piece of content.
+    
+    Args:
+        title: Content title
+        output_dir: Directory to save content to
+        
+    Returns:
+        Tuple of (JSON file path, text file path)
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_path = os.path.join(output_dir, f"{timestamp}_{_title_slug(title)}")
+    return f"{base_path}.json", f"{base_path}.txt"
+
+def _title_slug(title: str) -> str:
+    """
+    Turn a content title into a file name component.
+    
+    Args:
+        title: Content title
+        
+    Returns:
+        Lowercased title with separators replaced by underscores
+    """
+    return title.lower().replace(' ', '_').replace('/', '_').replace('\\', '_')
+
+def atomic_write_json(filepath: str, data: Dict[str, Any]) -> None:
+    """
+    Write JSON to a file so readers never see a partially written file.
+    
+    The data is written to a temporary file in the same directory which is
+    then renamed over the destination.
+    
+    Args:
+        filepath: Destination file path
+        data: Data to serialize
+    """
+    _atomic_write(filepath, lambda f: json.dump(data, f, indent=2))
+
+def atomic_write_bytes(filepath: str, data: bytes) -> None:
+    """
+    Write bytes to a file so readers never see a partially written file.
+    
+    Args:
+        filepath: Destination file path
+        data: Bytes to write
+    """
+    _atomic_write(filepath, lambda f: f.write(data), mode='wb')
+
+def atomic_write_text(filepath: str, text: str) -> None:
+    """
+    Write text to a file so readers never see a partially written file.
+    
+    Args:
+        filepath: Destination file path
+        text: Text to write
+    """
+    _atomic_write(filepath, lambda f: f.write(text))
+
+def _atomic_write(filepath: str, write: Callable[[Any], Any], mode: str = 'w') -> None:
+    """
+    Write a file through a temporary file that is renamed over the destination.
+    
+    Args:
+        filepath: Destination file path
+        write: Function writing the file contents to the open temporary file
+        mode: "w" for a text file or "wb" for a binary file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class OutputSink(ABC):
+    """
+    Destination for generated content.
+    
+    Sinks are shared by the content workers, so write must be thread-safe.
+    """
+
+    # Whether the text version can be streamed to disk while it is generated
+    supports_streaming = False
+
+    @abstractmethod
+    def write(self, content: Dict[str, Any]) -> str:
+        """
+        Save a piece of content.
+
+        Args:
+            content: Complete content returned by the content creator
+
+        Returns:
+            Location of the saved content
+        """
+
+    def close(self) -> None:
+        """
+        Flush buffered content and release open files.
+        """
+
+class FileOutputSink(OutputSink):
+    """
+    Writes each piece of content as a JSON file and a text file.
+    
+    Both files are written atomically. With a shard width, files are spread
+    over subdirectories named after the first hex characters of a hash of the
+    title, which keeps directories small at high volumes.
+    """
+
+    supports_streaming = True
+
+    def __init__(self, output_dir: str = "output", shard_width: int = 0):
+        """
+        Initialize the sink.
+
+        Args:
+            output_dir: Directory to save content to
+            shard_width: Number of hex characters of the title hash used as
+                subdirectory name (0 writes all files into output_dir)
+        """
+        self.output_dir = output_dir
+        self.shard_width = shard_width
+
+    def directory_for(self, title: str) -> str:
+        """
+        Get the directory that content with a given title is written to.
+
+        Args:
+            title: Content title
+
+        Returns:
+            Directory path, created if it does not exist yet
+        """
+        directory = self.output_dir
+        if self.shard_width:
+            digest = hashlib.sha1(_title_slug(title).encode('utf-8')).hexdigest()
+            directory = os.path.join(directory, digest[:self.shard_width])
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def write(self, content: Dict[str, Any]) -> str:
+        """
+        Save content as a JSON file and a text file for easy reading.
+
+        Args:
+            content: Complete content returned by the content creator
+
+        Returns:
+            Path of the JSON file
+        """
+        filepath, text_filepath = build_output_paths(content['title'], self.directory_for(content['title']))
+
+        atomic_write_json(filepath, content)
+        logger.info(f"Content saved to {filepath}")
+
+        atomic_write_text(text_filepath, f"Title: {content['title']}\n\n{content['content']}")
+        logger.info(f"Text version saved to {text_filepath}")
+        return filepath
+
+    def streaming_writer(self,
+                         title: str,
+                         on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> "StreamingContentWriter":
+        """
+        Create a writer streaming the text version of content as it is generated.
+
+        Args:
+            title: Content title
+            on_progress: Optional callback receiving progress events
+
+        Returns:
+            Streaming writer for the content
+        """
+        return StreamingContentWriter(title, self.directory_for(title), on_progress=on_progress)
+
+class JsonlShardSink(OutputSink):
+    """
+    Appends content to gzip-compressed JSONL shards for high-volume runs.
+    
+    Each shard holds up to records_per_shard articles, one JSON object per
+    line. A shard is written under a temporary name and renamed once it is
+    full, older than max_shard_seconds, or the sink is closed, so readers
+    only ever see complete shards. Every renamed shard adds one line per
+    article to index.jsonl, giving the shard file and line number of each
+    title.
+    
+    The temporary shard is flushed and synced to disk every sync_records
+    articles or sync_seconds, whichever comes first, and a finalized shard
+    is always synced. Temporary shards left behind by a killed run are
+    recovered into regular shards when the next sink is created for the same
+    directory, so a crash loses at most the articles written since the last
+    sync. Only one run should write to an output directory at a time.
+    """
+
+    INDEX_FILENAME = "index.jsonl"
+    TMP_SUFFIX = ".tmp"
+
+    def __init__(self,
+                 output_dir: str = "output",
+                 records_per_shard: int = 1000,
+                 compresslevel: int = 6,
+                 max_shard_seconds: float = 3600,
+                 sync_records: int = 50,
+                 sync_seconds: float = 5):
+        """
+        Initialize the sink and recover shards left behind by earlier runs.
+
+        Args:
+            output_dir: Directory to save shards and the index to
+            records_per_shard: Maximum number of articles per shard
+            compresslevel: gzip compression level (1-9)
+            max_shard_seconds: Age after which a shard is finalized at the next write
+            sync_records: Articles written between syncs of the temporary shard
+            sync_seconds: Seconds after which the temporary shard is synced at the next write
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.output_dir = output_dir
+        self.records_per_shard = max(1, records_per_shard)
+        self.compresslevel = compresslevel
+        self.max_shard_seconds = max_shard_seconds
+        self.sync_records = max(1, sync_records)
+        self.sync_seconds = sync_seconds
+        self.index_filepath = os.path.join(output_dir, self.INDEX_FILENAME)
+
+        self._run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self._shard_number = 0
+        self._shard_name = None
+        self._shard_opened_at = None
+        self._unsynced_records = 0
+        self._synced_at = None
+        self._file = None
+        self._pending_index: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        self._recover_shards()
+
+    def write(self, content: Dict[str, Any]) -> str:
+        """
+        Append content to the current shard.
+
+        Args:
+            content: Complete content returned by the content creator
+
+        Returns:
+            Shard file name and 1-based line number, as "<shard>#<line>"
+        """
+        line = json.dumps(content, ensure_ascii=False)
+        with self._lock:
+            if self._file is not None and time.monotonic() - self._shard_opened_at >= self.max_shard_seconds:
+                self._finalize_shard()
+            if self._file is None:
+                self._open_shard()
+
+            self._file.write(line + "\n")
+            self._unsynced_records += 1
+            if (self._unsynced_records >= self.sync_records
+                    or time.monotonic() - self._synced_at >= self.sync_seconds):
+                self._sync_shard()
+            line_number = len(self._pending_index) + 1
+            self._pending_index.append({
+                "title": content['title'],
+                "timestamp": content.get('timestamp'),
+                "shard": self._shard_name,
+                "line": line_number
+            })
+            location = f"{self._shard_name}#{line_number}"
+
+            if line_number >= self.records_per_shard:
+                self._finalize_shard()
+
+        logger.info(f"Content for '{content['title']}' appended to {location}")
+        return location
+
+    def close(self) -> None:
+        """
+        Finalize the current shard and write its index entries.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._finalize_shard()
+
+    def _open_shard(self) -> None:
+        """
+        Start a new shard under a temporary name.
+        """
+        self._shard_number += 1
+        self._shard_name = f"content_{self._run_id}_{self._shard_number:05d}.jsonl.gz"
+        tmp_path = os.path.join(self.output_dir, self._shard_name + self.TMP_SUFFIX)
+        self._file = gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=self.compresslevel)
+        self._shard_opened_at = time.monotonic()
+        self._synced_at = self._shard_opened_at
+        self._unsynced_records = 0
+
+    def _sync_shard(self) -> None:
+        """
+        Flush the temporary shard and sync it to disk.
+        
+        Each flush ends the compressed data at a byte boundary, which costs
+        some compression, so the shard on disk can be decompressed up to the
+        last synced article if the run is killed.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced_records = 0
+        self._synced_at = time.monotonic()
+
+    def _finalize_shard(self) -> None:
+        """
+        Close the current shard, move it into place and index its articles.
+        """
+        shard_path = os.path.join(self.output_dir, self._shard_name)
+        self._file.close()
+        with open(shard_path + self.TMP_SUFFIX, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(shard_path + self.TMP_SUFFIX, shard_path)
+        self._append_index(self._pending_index)
+
+        logger.info(f"Wrote {len(self._pending_index)} articles to shard {shard_path}")
+        self._file = None
+        self._pending_index = []
+
+    def _append_index(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append index entries and sync the index to disk.
+
+        Args:
+            entries: Index entries of a finalized shard
+        """
+        with open(self.index_filepath, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _recover_shards(self) -> None:
+        """
+        Turn temporary shards of killed runs into regular, indexed shards.
+        
+        Every complete article of a temporary shard is kept; a partially
+        written last line is dropped. Temporary shards without a complete
+        article are removed.
+        """
+        for filename in sorted(os.listdir(self.output_dir)):
+            if not (filename.startswith("content_") and filename.endswith(".jsonl.gz" + self.TMP_SUFFIX)):
+                continue
+            tmp_path = os.path.join(self.output_dir, filename)
+            shard_name = filename[:-len(self.TMP_SUFFIX)]
+
+            try:
+                records = _read_complete_records(tmp_path)
+                if records:
+                    atomic_write_bytes(
+                        os.path.join(self.output_dir, shard_name),
+                        gzip.compress("".join(line + "\n" for line, _ in records).encode('utf-8'),
+                                      compresslevel=self.compresslevel)
+                    )
+                    self._append_index([
+                        {"title": record.get('title'), "timestamp": record.get('timestamp'),
+                         "shard": shard_name, "line": line_number}
+                        for line_number, (_, record) in enumerate(records, start=1)
+                    ])
+                os.remove(tmp_path)
+                logger.warning(f"Recovered {len(records)} articles from unfinished shard {tmp_path}")
+            except Exception as e:
+                logger.error(f"Failed to recover unfinished shard {tmp_path}: {e}")
+
+def _read_complete_records(filepath: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read the complete JSON lines of a possibly truncated gzip file.
+    
+    Args:
+        filepath: Path of the gzip file
+        
+    Returns:
+        List of (line, parsed record) tuples
+    """
+    # Unlike gzip.open, a decompressor returns the data of a stream without its trailer
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    parts = []
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b""):
+            checkpoint = decompressor.copy()
+            try:
+                parts.append(decompressor.decompress(block))
+            except zlib.error:
+                # Torn write at the end: keep everything decompressible before it
+                for position in range(len(block)):
+                    try:
+                        parts.append(checkpoint.decompress(block[position:position + 1]))
+                    except zlib.error:
+                        break
+                break
+    data = b"".join(parts)
+
+    records = []
+    for line in data.decode('utf-8', errors='replace').split("\n")[:-1]:
+        try:
+            records.append((line, json.loads(line)))
+        except ValueError:
+            break
+    return records
+
+def create_output_sink(mode: str,
+                       output_dir: str = "output",
+                       shard_width: int = 0,
+                       records_per_shard: int = 1000,
+                       max_shard_seconds: float = 3600,
+                       sync_records: int = 50,
+                       sync_seconds: float = 5) -> OutputSink:
+    """
+    Create the output sink for an output mode.
+
+    Args:
+        mode: "files" for a JSON and a text file per article, or "jsonl" for
+            compressed JSONL shards with an index
+        output_dir: Directory to save content to
+        shard_width: Subdirectory hash width used in files mode
+        records_per_shard: Articles per shard used in jsonl mode
+        max_shard_seconds: Maximum shard age used in jsonl mode
+        sync_records: Articles between disk syncs used in jsonl mode
+        sync_seconds: Maximum seconds between disk syncs used in jsonl mode
+
+    Returns:
+        Output sink
+    """
+    if mode == "files":
+        return FileOutputSink(output_dir, shard_width=shard_width)
+    if mode == "jsonl":
+        return JsonlShardSink(
+            output_dir,
+            records_per_shard=records_per_shard,
+            max_shard_seconds=max_shard_seconds,
+            sync_records=sync_records,
+            sync_seconds=sync_seconds
+        )
+    raise ValueError(f"Unknown output mode: {mode}")
+
+class StreamingContentWriter:
+    """
+    Writes the text version of content incrementally as the LLM streams tokens.
+    
+    The JSON version is written atomically once generation has finished.
+    """
+
+    def __init__(self,
+                 title: str,
+                 output_dir: str = "output",
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the writer and open the text file.
+
+        Args:
+            title: Content title
+            output_dir: Directory to save content to
+            on_progress: Optional callback receiving progress events
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.title = title
+        self.json_filepath, self.text_filepath = build_output_paths(title, output_dir)
+        self.on_progress = on_progress
+        self.tokens = 0
+        self.chars = 0
+        self.started_at = time.monotonic()
+        self.first_token_at = None
+
+        self._file = open(self.text_filepath, 'w', encoding='utf-8')
+        self._file.write(f"Title: {title}\n\n")
+        self._file.flush()
+        self._emit("started")
+
+    def write(self, token: str) -> None:
+        """
+        Append a streamed token to the text file.
+
+        Args:
+            token: Token text received from the LLM
+        """
+        if not token:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+        self._file.write(token)
+        self._file.flush()
+        self.tokens += 1
+        self.chars += len(token)
+        self._emit("token")
+
+    def finalize(self, content: Dict[str, Any]) -> str:
+        """
+        Close the text file and write the JSON version of the content.
+
+        Args:
+            content: Complete content returned by the content creator
+
+        Returns:
+            Path of the JSON file
+        """
+        self._file.close()
+        atomic_write_json(self.json_filepath, content)
+        self._emit("completed")
+
+        logger.info(f"Text version streamed to {self.text_filepath}")
+        logger.info(f"Content saved to {self.json_filepath}")
+        return self.json_filepath
+
+    def abort(self) -> None:
+        """
+        Close and delete the partial text file after a failed generation.
+        """
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.text_filepath):
+            os.remove(self.text_filepath)
+        self._emit("failed")
+
+    def _emit(self, event: str) -> None:
+        """
+        Send a progress event to the callback.
+
+        Args:
+            event: Event name (started, token, completed or failed)
+        """
+        if not self.on_progress:
+            return
+
+        now = time.monotonic()
+        try:
+            self.on_progress({
+                "event": event,
+                "title": self.title,
+                "text_filepath": self.text_filepath,
+                "tokens": self.tokens,
+                "chars": self.chars,
+                "elapsed": now - self.started_at,
+                "time_to_first_token": (self.first_token_at - self.started_at) if self.first_token_at else None,
+            })
+        except Exception as e:
+            logger.error(f"Error in progress callback: {e}")
@@ -0,0 +1,312 @@
+"""
+Client-side rate limiting and retry for LLM API calls.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator, Optional
+from utils.llm_utils import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class Reservation:
+    """
+    Tokens held in a rate limiter window for one request.
+    """
+
+    def __init__(self, started: float, tokens: int, waited: float):
+        """
+        Initialize the reservation.
+
+        Args:
+            started: Monotonic time the request entered the window
+            tokens: Tokens currently counted against the window
+            waited: Number of seconds spent waiting for the reservation
+        """
+        self.started = started
+        self.tokens = tokens
+        self.waited = waited
+        self.expired = False
+
+class RateLimiter:
+    """
+    Sliding-window limiter for requests per minute and tokens per minute.
+
+    Callers block in acquire() until the request fits in the current window,
+    which applies backpressure to every thread sharing the limiter. Once the
+    actual usage is known, settle() replaces the estimate so unused tokens
+    are released back to the window.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_minute: Maximum requests started in any 60 second window
+            tokens_per_minute: Maximum estimated tokens used in any 60 second window
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window = deque()
+        self._window_tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> Reservation:
+        """
+        Block until a request using the given number of tokens may be sent.
+
+        A request larger than the whole token budget is let through once the
+        window is empty so it cannot block forever.
+
+        Args:
+            tokens: Estimated tokens used by the request
+
+        Returns:
+            Reservation holding the tokens in the window
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+
+                fits_requests = len(self._window) < self.requests_per_minute
+                fits_tokens = self._window_tokens + tokens <= self.tokens_per_minute
+                if fits_requests and (fits_tokens or not self._window):
+                    reservation = Reservation(now, tokens, now - started)
+                    self._window.append(reservation)
+                    self._window_tokens += tokens
+                    return reservation
+
+                wait = self._window[0].started + self.WINDOW_SECONDS - now
+
+            time.sleep(max(wait, 0.01))
+
+    def settle(self, reservation: Reservation, tokens: int) -> None:
+        """
+        Replace a reservation's estimated tokens with the tokens actually used.
+
+        Reservations that have already left the window are ignored.
+
+        Args:
+            reservation: Reservation returned by acquire()
+            tokens: Tokens the request actually used
+        """
+        with self._lock:
+            if reservation.expired:
+                return
+            self._window_tokens += tokens - reservation.tokens
+            reservation.tokens = tokens
+
+    def _expire(self, now: float) -> None:
+        """
+        Drop requests that have left the window. Must be called with the lock held.
+
+        Args:
+            now: Current monotonic time
+        """
+        while self._window and now - self._window[0].started >= self.WINDOW_SECONDS:
+            reservation = self._window.popleft()
+            reservation.expired = True
+            self._window_tokens -= reservation.tokens
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether an exception is an HTTP 429 / rate limit error.
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        True if the error indicates the request was rate limited
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code == 429:
+        return True
+
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the Retry-After header from a rate limit error, if present.
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        Number of seconds to wait, or None
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def _reported_tokens(message) -> Optional[int]:
+    """
+    Read the total tokens an LLM call used from its response, if reported.
+
+    Args:
+        message: Response message or final stream chunk
+
+    Returns:
+        Prompt plus completion tokens, or None if the provider did not report them
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("total_tokens") is not None:
+        return usage["total_tokens"]
+
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    if token_usage.get("total_tokens") is not None:
+        return token_usage["total_tokens"]
+    return None
+
+class RateLimitedLLM:
+    """
+    Wrapper around a LangChain chat model that respects API quotas.
+
+    Every call waits for the shared rate limiter, reserving the estimated
+    prompt tokens plus completion_tokens, and the reservation is settled with
+    the usage the response reports. Calls rejected with a 429 release their
+    tokens and are retried with exponential backoff and full jitter.
+    Attributes not defined here are forwarded to the wrapped model.
+    """
+
+    def __init__(self,
+                 llm,
+                 limiter: RateLimiter,
+                 completion_tokens: int,
+                 max_retries: int = 5,
+                 base_delay: float = 2.0):
+        """
+        Initialize the rate limited LLM.
+
+        Args:
+            llm: Language model to wrap
+            limiter: Rate limiter shared by all callers
+            completion_tokens: Estimated completion tokens reserved per call
+            max_retries: Maximum number of retries after a rate limit error
+            base_delay: Base delay in seconds for the exponential backoff
+        """
+        self.llm = llm
+        self.limiter = limiter
+        self.completion_tokens = completion_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+    def invoke(self, prompt, *args, **kwargs):
+        """
+        Invoke the model once the rate limiter allows it.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Returns:
+            Model response message
+        """
+        attempt = 0
+        while True:
+            reservation = self._acquire(prompt)
+            try:
+                response = self.llm.invoke(prompt, *args, **kwargs)
+            except Exception as e:
+                attempt = self._handle_error(e, attempt, reservation)
+                continue
+            self._settle(reservation, response)
+            return response
+
+    def stream(self, prompt, *args, **kwargs) -> Iterator[Any]:
+        """
+        Stream the model response once the rate limiter allows it.
+
+        Rate limit errors are only retried before the first chunk arrives.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Yields:
+            Response message chunks
+        """
+        attempt = 0
+        while True:
+            reservation = self._acquire(prompt)
+            started = False
+            try:
+                for chunk in self.llm.stream(prompt, *args, **kwargs):
+                    started = True
+                    # Providers report usage on the final chunk
+                    if _reported_tokens(chunk) is not None:
+                        self._settle(reservation, chunk)
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                attempt = self._handle_error(e, attempt, reservation)
+
+    def _acquire(self, prompt) -> Reservation:
+        """
+        Wait for the rate limiter before sending a prompt.
+
+        Args:
+            prompt: Prompt about to be sent
+
+        Returns:
+            Reservation for the call
+        """
+        reservation = self.limiter.acquire(estimate_tokens(str(prompt)) + self.completion_tokens)
+        if reservation.waited > 1:
+            logger.info(f"Waited {reservation.waited:.1f}s for LLM rate limit")
+        return reservation
+
+    def _settle(self, reservation: Reservation, message) -> None:
+        """
+        Settle a reservation with the usage reported in a response.
+
+        The estimate is kept when the provider does not report usage.
+
+        Args:
+            reservation: Reservation for the call
+            message: Response message or final stream chunk
+        """
+        tokens = _reported_tokens(message)
+        if tokens is not None:
+            self.limiter.settle(reservation, tokens)
+
+    def _handle_error(self, error: Exception, attempt: int, reservation: Reservation) -> int:
+        """
+        Sleep before retrying a rate limited call, or re-raise other errors.
+
+        Args:
+            error: Exception raised by the wrapped model
+            attempt: Number of retries made so far
+            reservation: Reservation for the failed call
+
+        Returns:
+            Updated retry count
+        """
+        if not is_rate_limit_error(error) or attempt >= self.max_retries:
+            raise error
+
+        # A rejected request uses no tokens, only its slot in the request count
+        self.limiter.settle(reservation, 0)
+
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, self.base_delay * (2 ** attempt))
+        logger.warning(f"LLM rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+        return attempt + 1
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
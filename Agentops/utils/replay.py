@@ -0,0 +1,405 @@
+"""
+Record/replay of LLM and HTTP traffic for offline benchmarking.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Iterator, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def prompt_key(prompt) -> str:
+    """
+    Build the fixture key for a prompt.
+
+    Args:
+        prompt: Prompt sent to the LLM
+
+    Returns:
+        Hex digest of the whitespace-normalized prompt
+    """
+    normalized_prompt = " ".join(str(prompt).split())
+    return hashlib.sha256(normalized_prompt.encode('utf-8')).hexdigest()
+
+class Fixtures:
+    """
+    Recorded LLM responses and HTTP bodies for one or more pipeline runs.
+    """
+
+    def __init__(self, llm: Optional[Dict[str, Dict[str, str]]] = None,
+                 http: Optional[Dict[str, str]] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the fixtures.
+
+        Args:
+            llm: Mapping of prompt keys to {"prompt", "response"} records
+            http: Mapping of URLs to page bodies
+            metadata: Information about the recording (model, categories, ...)
+        """
+        self.llm = llm or {}
+        self.http = http or {}
+        self.metadata = metadata or {}
+        self._lock = threading.Lock()
+
+    def record_llm(self, prompt, response: str) -> None:
+        """
+        Record an LLM response.
+
+        Args:
+            prompt: Prompt sent to the LLM
+            response: Response text
+        """
+        with self._lock:
+            self.llm[prompt_key(prompt)] = {"prompt": str(prompt), "response": response}
+
+    def record_http(self, url: str, body: str) -> None:
+        """
+        Record a fetched page.
+
+        Args:
+            url: Requested URL
+            body: Page content
+        """
+        with self._lock:
+            self.http[url] = body
+
+    def save(self, filepath: str) -> None:
+        """
+        Write the fixtures to a JSON file.
+
+        Args:
+            filepath: Destination file path
+        """
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {
+                "metadata": {**self.metadata, "recorded_at": datetime.now().isoformat()},
+                "llm": self.llm,
+                "http": self.http,
+            }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"Saved {len(self.llm)} LLM and {len(self.http)} HTTP fixtures to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> "Fixtures":
+        """
+        Load fixtures from a JSON file.
+
+        Args:
+            filepath: Fixture file path
+
+        Returns:
+            Loaded fixtures
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(llm=data.get("llm"), http=data.get("http"), metadata=data.get("metadata"))
+
+class LatencyDistribution:
+    """
+    Random latency model parsed from a spec such as 'lognormal:-0.5,0.6'.
+
+    Supported specs: 'none', 'constant:SECONDS', 'uniform:LOW,HIGH',
+    'normal:MEAN,STDDEV' and 'lognormal:MU,SIGMA'.
+    """
+
+    KINDS = ("none", "constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None):
+        """
+        Initialize the distribution.
+
+        Args:
+            spec: Distribution spec
+            seed: Optional random seed for reproducible runs
+        """
+        kind, _, params = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",")] if params else []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """
+        Draw a latency.
+
+        Returns:
+            Latency in seconds (never negative)
+        """
+        with self._lock:
+            if self.kind == "none":
+                return 0.0
+            if self.kind == "constant":
+                return self.params[0]
+            if self.kind == "uniform":
+                return self._random.uniform(*self.params)
+            if self.kind == "normal":
+                return max(0.0, self._random.gauss(*self.params))
+            return self._random.lognormvariate(*self.params)
+
+    def sleep(self) -> float:
+        """
+        Sleep for a sampled latency.
+
+        Returns:
+            Number of seconds slept
+        """
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+class RecordingLLM:
+    """
+    Wrapper around a LangChain chat model that records every prompt and response.
+
+    Attributes not defined here are forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm, fixtures: Fixtures):
+        """
+        Initialize the recording LLM.
+
+        Args:
+            llm: Language model to wrap
+            fixtures: Fixtures receiving the recorded responses
+        """
+        self.llm = llm
+        self.fixtures = fixtures
+
+    def invoke(self, prompt, *args, **kwargs):
+        """
+        Invoke the model and record the response.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Returns:
+            Model response message
+        """
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self.fixtures.record_llm(prompt, response.content)
+        return response
+
+    def stream(self, prompt, *args, **kwargs) -> Iterator[Any]:
+        """
+        Stream the model response and record it once complete.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Yields:
+            Response message chunks
+        """
+        parts = []
+        for chunk in self.llm.stream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.fixtures.record_llm(prompt, "".join(parts))
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+class ReplayResponse:
+    """
+    Minimal stand-in for an LLM message served from fixtures.
+    """
+
+    def __init__(self, content: str):
+        """
+        Initialize the replayed response.
+
+        Args:
+            content: Recorded response text
+        """
+        self.content = content
+        self.response_metadata = {}
+
+class FakeLLM:
+    """
+    LLM replaying recorded responses with simulated latency.
+    """
+
+    MISSING_RESPONSE = "No recorded response for this prompt."
+
+    def __init__(self, fixtures: Fixtures, latency: LatencyDistribution,
+                 model_name: str = "replay", stream_chunk_words: int = 5):
+        """
+        Initialize the fake LLM.
+
+        Args:
+            fixtures: Recorded LLM responses
+            latency: Latency applied to each call before the response is returned
+            model_name: Model name reported to wrappers such as the response cache
+            stream_chunk_words: Number of words per chunk when streaming
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.model_name = model_name
+        self.temperature = None
+        self.stream_chunk_words = stream_chunk_words
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.misses = 0
+
+    def _lookup(self, prompt) -> str:
+        """
+        Find the recorded response for a prompt.
+
+        Args:
+            prompt: Prompt sent to the LLM
+
+        Returns:
+            Recorded response text, or a placeholder on a replay miss
+        """
+        record = self.fixtures.llm.get(prompt_key(prompt))
+        with self._lock:
+            self.calls += 1
+            if record is None:
+                self.misses += 1
+        if record is None:
+            logger.warning("Replay miss: prompt not found in fixtures")
+            return self.MISSING_RESPONSE
+        return record["response"]
+
+    def invoke(self, prompt, *args, **kwargs) -> ReplayResponse:
+        """
+        Return the recorded response after the simulated latency.
+
+        Args:
+            prompt: Prompt sent to the LLM
+
+        Returns:
+            Recorded response message
+        """
+        response = self._lookup(prompt)
+        self.latency.sleep()
+        return ReplayResponse(response)
+
+    def stream(self, prompt, *args, **kwargs) -> Iterator[ReplayResponse]:
+        """
+        Stream the recorded response in chunks after the simulated latency.
+
+        Args:
+            prompt: Prompt sent to the LLM
+
+        Yields:
+            Response message chunks
+        """
+        words = self._lookup(prompt).split(" ")
+        self.latency.sleep()
+        for i in range(0, len(words), self.stream_chunk_words):
+            chunk = " ".join(words[i:i + self.stream_chunk_words])
+            yield ReplayResponse(chunk if i == 0 else " " + chunk)
+
+class StandInServer:
+    """
+    Local HTTP server replaying recorded pages with simulated latency.
+
+    Use rewrite() with web_utils.set_url_rewriter to send the pipeline's
+    requests here instead of to the real sites.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency: LatencyDistribution):
+        """
+        Initialize the stand-in server.
+
+        Args:
+            fixtures: Recorded HTTP bodies
+            latency: Latency applied to each request
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.requests = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> "StandInServer":
+        """
+        Start serving on a free local port.
+
+        Returns:
+            The started server
+        """
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = parse_qs(urlparse(self.path).query).get("url", [""])[0]
+                body = stand_in.fixtures.http.get(url)
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    if body is None:
+                        stand_in.misses += 1
+                stand_in.latency.sleep()
+
+                payload = (body or "").encode('utf-8')
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in HTTP server listening on {self.base_url}")
+        return self
+
+    @property
+    def base_url(self) -> str:
+        """
+        Get the base URL of the running server.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rewrite(self, url: str) -> str:
+        """
+        Map a real URL to its stand-in URL.
+
+        Args:
+            url: URL requested by the pipeline
+
+        Returns:
+            URL on the stand-in server
+        """
+        return f"{self.base_url}/replay?url={quote(url, safe='')}"
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
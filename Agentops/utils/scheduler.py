@@ -0,0 +1,62 @@
+"""
+Concurrent job scheduler for producing content for many topics.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ContentScheduler:
+    """
+    Runs one job per item on a bounded worker pool.
+
+    Submission blocks once max_pending jobs are queued or running, so a long
+    list of items never piles up in memory ahead of the workers.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers: Number of jobs running at the same time
+            max_pending: Maximum number of jobs queued or running (defaults to twice max_workers)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending or self.max_workers * 2)
+
+    def run(self, items: List[Any], job: Callable[[Any], Any]) -> List[Optional[Any]]:
+        """
+        Run a job for every item.
+
+        Args:
+            items: Items to process
+            job: Function called with each item
+
+        Returns:
+            Job results in the order of the items; None for jobs that failed
+        """
+        slots = threading.BoundedSemaphore(self.max_pending)
+        futures = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="content") as executor:
+            for item in items:
+                slots.acquire()
+                future = executor.submit(job, item)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+
+        results = []
+        for position, future in enumerate(futures, start=1):
+            error = future.exception()
+            if error:
+                logger.error(f"Job {position}/{len(futures)} failed: {error}", exc_info=error)
+                results.append(None)
+            else:
+                results.append(future.result())
+
+        return results
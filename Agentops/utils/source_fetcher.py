@@ -0,0 +1,166 @@
+"""
+Concurrent fetching and parsing of trending topic sources.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
+from utils.web_utils import fetch_webpage, extract_trending_topics_from_google_trends
+from utils.tracing import tracer
+import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Parsers turning a source's HTML into topics, keyed by a URL substring
+SOURCE_PARSERS: Dict[str, Callable[[str], List[Dict[str, Any]]]] = {
+    "google.com/trends": extract_trending_topics_from_google_trends,
+}
+
+def register_source_parser(url_pattern: str, parser: Callable[[str], List[Dict[str, Any]]]) -> None:
+    """
+    Register a parser for a trending topic source.
+    
+    Args:
+        url_pattern: Substring identifying the source URLs the parser handles
+        parser: Function taking the page HTML and returning a list of topics
+    """
+    SOURCE_PARSERS[url_pattern] = parser
+
+def get_source_parser(url: str) -> Optional[Callable[[str], List[Dict[str, Any]]]]:
+    """
+    Find the registered parser for a source URL.
+    
+    Args:
+        url: Source URL
+        
+    Returns:
+        Parser function, or None if no parser handles the URL
+    """
+    for url_pattern, parser in SOURCE_PARSERS.items():
+        if url_pattern in url:
+            return parser
+    return None
+
+async def fetch_sources(urls: List[str],
+                        executor: ThreadPoolExecutor,
+                        per_source_timeout: float,
+                        total_budget: float) -> Dict[str, str]:
+    """
+    Fetch several sources concurrently.
+    
+    Each source gets its own deadline and the whole fetch is capped by a
+    global budget; sources that miss either are left out of the result.
+    
+    Args:
+        urls: Source URLs to fetch
+        executor: Thread pool running the blocking HTTP requests
+        per_source_timeout: Deadline in seconds for each source
+        total_budget: Deadline in seconds for all sources together
+        
+    Returns:
+        Dictionary mapping each successfully fetched URL to its HTML content
+    """
+    loop = asyncio.get_running_loop()
+    fetch = tracer.bind(fetch_webpage)
+
+    async def fetch_one(url: str) -> str:
+        return await asyncio.wait_for(
+            loop.run_in_executor(executor, fetch, url, per_source_timeout),
+            timeout=per_source_timeout
+        )
+
+    tasks = {url: asyncio.ensure_future(fetch_one(url)) for url in urls}
+    if not tasks:
+        return {}
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=total_budget)
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    for url, task in tasks.items():
+        if task in pending:
+            logger.warning(f"Fetch budget of {total_budget}s exhausted before {url} responded")
+            continue
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            logger.warning(f"Source {url} missed its {per_source_timeout}s deadline")
+            continue
+        if error:
+            logger.error(f"Error fetching trends from {url}: {error}")
+            continue
+        results[url] = task.result()
+
+    return results
+
+def _run_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    asyncio.run cannot be called from a thread whose event loop is already
+    running, so in that case the coroutine runs on a helper thread instead.
+    
+    Args:
+        coroutine: Coroutine to run
+        
+    Returns:
+        Result of the coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="source-loop") as runner:
+        return runner.submit(asyncio.run, coroutine).result()
+
+def collect_trending_topics(urls: List[str] = None,
+                            per_source_timeout: float = None,
+                            total_budget: float = None) -> List[Dict[str, Any]]:
+    """
+    Fetch all trending topic sources in parallel and parse their topics.
+    
+    Sources without a registered parser are skipped without being fetched.
+    This is a blocking call. When it is made from a thread with a running
+    event loop, the fetch runs its own loop on a helper thread, which blocks
+    the calling loop until the sources are in or the budget is spent.
+    
+    Args:
+        urls: Source URLs (defaults to config setting)
+        per_source_timeout: Deadline in seconds for each source (defaults to config setting)
+        total_budget: Deadline in seconds for all sources together (defaults to config setting)
+        
+    Returns:
+        Topics from all sources, in the order the sources are listed
+    """
+    urls = config.TRENDING_SOURCES if urls is None else urls
+    per_source_timeout = per_source_timeout or config.SOURCE_FETCH_TIMEOUT
+    total_budget = total_budget or config.SOURCE_FETCH_BUDGET
+
+    parseable_urls = [url for url in urls if get_source_parser(url)]
+    for url in urls:
+        if url not in parseable_urls:
+            logger.debug(f"No parser registered for {url}, skipping")
+    if not parseable_urls:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=len(parseable_urls), thread_name_prefix="source")
+    try:
+        pages = _run_sync(fetch_sources(parseable_urls, executor, per_source_timeout, total_budget))
+    finally:
+        # Return without waiting for requests that missed the budget; they still end
+        # after their own request timeout, and the interpreter joins them at exit
+        executor.shutdown(wait=False)
+
+    all_topics = []
+    for url in parseable_urls:
+        if url not in pages:
+            continue
+        try:
+            all_topics.extend(get_source_parser(url)(pages[url]))
+        except Exception as e:
+            logger.error(f"Error parsing trends from {url}: {e}")
+
+    return all_topics
@@ -0,0 +1,197 @@
+"""
+SQLite store of seen topics for incremental pipeline runs.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _normalize(text: str) -> str:
+    """
+    Normalize text so that case, punctuation and spacing changes are ignored.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Lowercase words separated by single spaces
+    """
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+def topic_key(topic: Dict[str, Any]) -> str:
+    """
+    Get the key identifying a topic across runs.
+
+    Args:
+        topic: Topic information
+
+    Returns:
+        Normalized topic title
+    """
+    return _normalize(topic['title'])
+
+def topic_fingerprint(topic: Dict[str, Any]) -> str:
+    """
+    Fingerprint the source data of a topic.
+
+    Args:
+        topic: Topic information with title and description
+
+    Returns:
+        Hex digest that changes only when the title or description materially changes
+    """
+    text = f"{_normalize(topic['title'])}\n{_normalize(topic.get('description', ''))}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class TopicStore:
+    """
+    Records seen topics, their enrichment results and when content was generated for them.
+    """
+
+    ENRICHMENT_FIELDS = ("search_results", "key_points")
+
+    def __init__(self, path: str):
+        """
+        Initialize the topic store.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS topics (
+                key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                enrichment TEXT,
+                enriched_at REAL,
+                content_generated_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[Tuple]:
+        return self._conn.execute(
+            "SELECT fingerprint, enrichment, content_generated_at FROM topics WHERE key = ?", (key,)
+        ).fetchone()
+
+    def filter_new_or_changed(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Record topics as seen and keep only those that still need work.
+
+        A topic needs work when it has never been seen, when its title or
+        description changed materially since it was last seen, or when no
+        content has been generated for its current version yet.
+
+        Args:
+            topics: Topics scraped in this run
+
+        Returns:
+            Topics that are new, changed, or not yet covered
+        """
+        now = time.time()
+        delta = []
+        with self._lock:
+            for topic in topics:
+                key = topic_key(topic)
+                fingerprint = topic_fingerprint(topic)
+                row = self._get(key)
+
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO topics (key, title, fingerprint, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                        (key, topic['title'], fingerprint, now, now)
+                    )
+                    delta.append(topic)
+                    continue
+
+                stored_fingerprint, _, content_generated_at = row
+                if stored_fingerprint != fingerprint:
+                    # Material change: forget the stale enrichment and content
+                    self._conn.execute(
+                        "UPDATE topics SET title = ?, fingerprint = ?, last_seen = ?, enrichment = NULL, "
+                        "enriched_at = NULL, content_generated_at = NULL WHERE key = ?",
+                        (topic['title'], fingerprint, now, key)
+                    )
+                    delta.append(topic)
+                else:
+                    self._conn.execute("UPDATE topics SET last_seen = ? WHERE key = ?", (now, key))
+                    if content_generated_at is None:
+                        delta.append(topic)
+            self._conn.commit()
+
+        logger.info(f"Topic store: {len(delta)} of {len(topics)} topics are new or changed")
+        return delta
+
+    def get_enrichment(self, topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored enrichment for the current version of a topic.
+
+        Args:
+            topic: Topic information
+
+        Returns:
+            Dictionary with search_results and key_points, or None
+        """
+        with self._lock:
+            row = self._get(topic_key(topic))
+        if row is None or row[0] != topic_fingerprint(topic) or not row[1]:
+            return None
+        return json.loads(row[1])
+
+    def record_enrichment(self, topic: Dict[str, Any]) -> None:
+        """
+        Store the enrichment results of a topic.
+
+        Args:
+            topic: Enriched topic
+        """
+        enrichment = {field: topic[field] for field in self.ENRICHMENT_FIELDS if field in topic}
+        with self._lock:
+            self._conn.execute(
+                "UPDATE topics SET enrichment = ?, enriched_at = ? WHERE key = ? AND fingerprint = ?",
+                (json.dumps(enrichment), time.time(), topic_key(topic), topic_fingerprint(topic))
+            )
+            self._conn.commit()
+
+    def mark_generated(self, topic: Dict[str, Any]) -> None:
+        """
+        Record that content was generated for the current version of a topic.
+
+        Args:
+            topic: Topic the content was created for
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE topics SET content_generated_at = ? WHERE key = ? AND fingerprint = ?",
+                (time.time(), topic_key(topic), topic_fingerprint(topic))
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,382 @@
+"""
+Lightweight tracing of pipeline stages, LLM token usage and cache hits.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional
+from utils.llm_utils import estimate_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class Span:
+    """
+    A timed pipeline stage.
+    """
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the span.
+
+        Args:
+            name: Stage name
+            parent: Enclosing span, if any
+            attributes: Additional attributes such as token counts
+        """
+        self.name = name
+        self.parent = parent
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.attributes = dict(attributes or {})
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """
+        Get the span duration in seconds (up to now if the span is still open).
+        """
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attributes) -> None:
+        """
+        Set attributes on the span.
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span to a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary describing the span
+        """
+        return {
+            "name": self.name,
+            "path": self.path,
+            "parent": self.parent.path if self.parent else None,
+            "thread": self.thread,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+class Tracer:
+    """
+    Records spans for one pipeline run.
+
+    Spans nest per thread. Work handed to other threads keeps its place in
+    the tree when wrapped with bind().
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Record spans; when False spans are still timed but discarded
+        """
+        self.enabled = enabled
+        self._spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self) -> Optional[Span]:
+        """
+        Get the innermost open span of the calling thread.
+
+        Returns:
+            Current span, or None
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Time a stage as a child of the current span.
+
+        Args:
+            name: Stage name
+            **attributes: Initial span attributes
+
+        Yields:
+            The open span
+        """
+        span = Span(name, self.current_span(), attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.end = time.time()
+            stack.pop()
+            self.record(span)
+
+    def record(self, span: Span) -> None:
+        """
+        Record a finished span.
+
+        Spans that stay open across yields are created directly instead of
+        with span(), so they never sit on the thread's stack, and are
+        recorded with this method once they end.
+
+        Args:
+            span: Finished span
+        """
+        if self.enabled:
+            with self._lock:
+                self._spans.append(span)
+
+    def bind(self, fn: Callable) -> Callable:
+        """
+        Wrap a function so it runs under the current span in any thread.
+
+        Args:
+            fn: Function to wrap
+
+        Returns:
+            Wrapped function
+        """
+        parent = self.current_span()
+
+        def bound(*args, **kwargs):
+            stack = self._stack()
+            if parent:
+                stack.append(parent)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if parent:
+                    stack.pop()
+
+        return bound
+
+    def spans(self) -> List[Span]:
+        """
+        Get all finished spans.
+
+        Returns:
+            List of spans in the order they finished
+        """
+        with self._lock:
+            return list(self._spans)
+
+    def reset(self) -> None:
+        """
+        Discard all recorded spans.
+        """
+        with self._lock:
+            self._spans = []
+
+    def export_jsonl(self, filepath: str) -> None:
+        """
+        Write all finished spans to a JSONL file.
+
+        Args:
+            filepath: Destination file path
+        """
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for span in self.spans():
+                f.write(json.dumps(span.to_dict()) + "\n")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Summarize span durations and LLM usage per stage path.
+
+        Returns:
+            One row per stage path with count, total, p50, p95 and max durations,
+            token counts and cache hits
+        """
+        groups = {}
+        for span in self.spans():
+            groups.setdefault(span.path, []).append(span)
+
+        rows = []
+        for path, spans in sorted(groups.items()):
+            durations = sorted(span.duration for span in spans)
+            rows.append({
+                "stage": path,
+                "count": len(spans),
+                "errors": sum(1 for span in spans if span.error),
+                "total": sum(durations),
+                "p50": _percentile(durations, 50),
+                "p95": _percentile(durations, 95),
+                "max": durations[-1],
+                "prompt_tokens": sum(span.attributes.get("prompt_tokens", 0) for span in spans),
+                "completion_tokens": sum(span.attributes.get("completion_tokens", 0) for span in spans),
+                "cache_hits": sum(1 for span in spans if span.attributes.get("cache_hit")),
+            })
+        return rows
+
+    def format_summary(self) -> str:
+        """
+        Format the per-stage summary as a text table.
+
+        Returns:
+            Table with one line per stage path
+        """
+        header = f"{'stage':<40} {'count':>5} {'err':>4} {'total s':>9} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'prompt tok':>10} {'compl tok':>10} {'cached':>6}"
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['stage']:<40} {row['count']:>5} {row['errors']:>4} {row['total']:>9.2f} "
+                f"{row['p50']:>8.3f} {row['p95']:>8.3f} {row['max']:>8.3f} "
+                f"{row['prompt_tokens']:>10} {row['completion_tokens']:>10} {row['cache_hits']:>6}"
+            )
+        return "\n".join(lines)
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """
+    Get a nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        percentile: Percentile between 0 and 100
+
+    Returns:
+        Percentile value
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+# Tracer shared by the whole pipeline
+tracer = Tracer()
+
+def _token_usage(message, prompt: str, completion: str) -> Dict[str, Any]:
+    """
+    Read token usage from an LLM message, estimating it when not reported.
+
+    Args:
+        message: Final LLM message or chunk
+        prompt: Prompt sent to the LLM
+        completion: Completion text
+
+    Returns:
+        Dictionary with prompt_tokens, completion_tokens and tokens_estimated
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("input_tokens") is not None:
+        return {
+            "prompt_tokens": usage["input_tokens"],
+            "completion_tokens": usage.get("output_tokens", 0),
+            "tokens_estimated": False,
+        }
+
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    if token_usage.get("prompt_tokens") is not None:
+        return {
+            "prompt_tokens": token_usage["prompt_tokens"],
+            "completion_tokens": token_usage.get("completion_tokens", 0),
+            "tokens_estimated": False,
+        }
+
+    return {
+        "prompt_tokens": estimate_tokens(str(prompt)),
+        "completion_tokens": estimate_tokens(completion) if completion else 0,
+        "tokens_estimated": True,
+    }
+
+def _is_cached(message) -> bool:
+    return bool((getattr(message, "response_metadata", None) or {}).get("cached"))
+
+class TracedLLM:
+    """
+    Wrapper around a LangChain chat model recording an 'llm' span per call.
+
+    Each span carries prompt and completion token counts and whether the
+    response came from the cache (cached calls count zero tokens). Attributes
+    not defined here are forwarded to the wrapped model.
+    """
+
+    def __init__(self, llm, tracer: Tracer = tracer):
+        """
+        Initialize the traced LLM.
+
+        Args:
+            llm: Language model to wrap
+            tracer: Tracer recording the spans
+        """
+        self.llm = llm
+        self.tracer = tracer
+
+    def invoke(self, prompt, *args, **kwargs):
+        """
+        Invoke the model inside an 'llm' span.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Returns:
+            Model response message
+        """
+        with self.tracer.span("llm") as span:
+            response = self.llm.invoke(prompt, *args, **kwargs)
+            self._record(span, response, prompt, response.content)
+            return response
+
+    def stream(self, prompt, *args, **kwargs) -> Iterator[Any]:
+        """
+        Stream the model response inside an 'llm' span.
+
+        The span is not pushed onto the thread's span stack, so spans the
+        caller opens while consuming chunks keep their own place in the tree.
+
+        Args:
+            prompt: Prompt to send to the model
+
+        Yields:
+            Response message chunks
+        """
+        span = Span("llm", self.tracer.current_span(), {"streamed": True})
+        parts = []
+        last_chunk = None
+        try:
+            for chunk in self.llm.stream(prompt, *args, **kwargs):
+                if not parts:
+                    span.set(time_to_first_token=time.time() - span.start)
+                parts.append(chunk.content)
+                last_chunk = chunk
+                yield chunk
+            self._record(span, last_chunk, prompt, "".join(parts))
+        except GeneratorExit:
+            # The caller stopped consuming the stream
+            span.set(abandoned=True)
+            raise
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.end = time.time()
+            self.tracer.record(span)
+
+    def _record(self, span: Span, message, prompt, completion: str) -> None:
+        if _is_cached(message):
+            span.set(cache_hit=True, prompt_tokens=0, completion_tokens=0)
+        else:
+            span.set(cache_hit=False, **_token_usage(message, prompt, completion))
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
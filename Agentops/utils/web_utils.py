@@ -2,72 +2,237 @@
 Utility functions for web scraping and API interactions.
 """
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import json
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import Callable, List, Dict, Any, Optional
+from utils.http_cache import HttpCache
+from utils.html_parsing import select_items
+from utils.tracing import tracer
+import config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def fetch_webpage(url: str) -> str:
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+_session = None
+_http_cache = None
+_setup_lock = threading.Lock()
+
+# Hooks used by the record/replay benchmark harness
+_url_rewriter = None
+_fetch_observers = []
+
+def get_session() -> requests.Session:
+    """
+    Get the shared HTTP session.
+    
+    The session keeps connections alive between requests and limits the
+    number of pooled connections per host.
+    
+    Returns:
+        Shared requests session
+    """
+    global _session
+    with _setup_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(
+                pool_connections=config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=config.HTTP_POOL_MAXSIZE,
+                pool_block=True
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Get the shared on-disk HTTP cache.
+    
+    Returns:
+        Shared HTTP cache, or None if caching is disabled
+    """
+    global _http_cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    with _setup_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(
+                config.HTTP_CACHE_DIR,
+                config.HTTP_CACHE_TTL,
+                max_age=config.HTTP_CACHE_MAX_AGE,
+                max_bytes=config.HTTP_CACHE_MAX_BYTES,
+                evict_every=config.HTTP_CACHE_EVICT_EVERY
+            )
+        return _http_cache
+
+def get_http_cache_stats() -> Dict[str, int]:
+    """
+    Get the hit/miss counters of the HTTP cache.
+    
+    Returns:
+        Dictionary with hits, revalidated, stale and misses counts
+    """
+    cache = get_http_cache()
+    return cache.stats() if cache else {"hits": 0, "revalidated": 0, "stale": 0, "misses": 0}
+
+def set_url_rewriter(rewriter: Optional[Callable[[str], str]]) -> None:
+    """
+    Redirect requests made by fetch_webpage, e.g. to a local stand-in server.
+    
+    Args:
+        rewriter: Function mapping a requested URL to the URL actually fetched, or None to reset
+    """
+    global _url_rewriter
+    _url_rewriter = rewriter
+
+def add_fetch_observer(observer: Callable[[str, str], None]) -> None:
+    """
+    Register a function called with the URL and body of every fetched page.
+    
+    Args:
+        observer: Function taking the requested URL and the page content
+    """
+    _fetch_observers.append(observer)
+
+def remove_fetch_observer(observer: Callable[[str, str], None]) -> None:
+    """
+    Unregister a function added with add_fetch_observer.
+    
+    Args:
+        observer: Previously registered observer
+    """
+    if observer in _fetch_observers:
+        _fetch_observers.remove(observer)
+
+def fetch_webpage(url: str, timeout: float = 10) -> str:
     """
     Fetch the content of a webpage.
     
     Args:
         url: The URL to fetch
+        timeout: Connect and read timeout in seconds
         
     Returns:
         The HTML content of the webpage
     """
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.text
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching {url}: {e}")
-        return ""
+    request_url = _url_rewriter(url) if _url_rewriter else url
+    html_content = _fetch_webpage(request_url, timeout)
+    
+    for observer in list(_fetch_observers):
+        try:
+            observer(url, html_content)
+        except Exception as e:
+            logger.error(f"Error in fetch observer for {url}: {e}")
+    
+    return html_content
+
+def _fetch_webpage(url: str, timeout: float) -> str:
+    """
+    Fetch a webpage through the HTTP cache and the shared session.
+    
+    Responses are served from the HTTP cache while fresh, and revalidated
+    with a conditional GET once the cache TTL has expired. When the request
+    fails or the server returns a 5xx error, an expired cached copy is
+    served instead of nothing.
+    
+    Args:
+        url: The URL to fetch
+        timeout: Connect and read timeout in seconds
+        
+    Returns:
+        The HTML content of the webpage
+    """
+    with tracer.span("http", url=url) as span:
+        cache = get_http_cache()
+        entry = cache.get(url) if cache else None
+    
+        if entry and cache.is_fresh(entry):
+            cache.record("hits")
+            span.set(cache_hit=True)
+            logger.debug(f"HTTP cache hit for {url}")
+            return entry["body"]
+    
+        try:
+            headers = cache.conditional_headers(entry) if entry else {}
+            response = get_session().get(url, headers=headers, timeout=timeout)
+        
+            if response.status_code == 304 and entry:
+                cache.record("revalidated")
+                span.set(cache_hit=True, revalidated=True)
+                cache.refresh(url, entry)
+                logger.debug(f"HTTP cache revalidated {url}")
+                return entry["body"]
+        
+            response.raise_for_status()
+            span.set(cache_hit=False, bytes=len(response.content))
+        
+            if cache:
+                cache.record("misses")
+                cache.store(
+                    url,
+                    response.text,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+            return response.text
+        except requests.exceptions.RequestException as e:
+            span.error = str(e)
+            server_failed = e.response is None or e.response.status_code >= 500
+            if entry and server_failed:
+                cache.record("stale")
+                span.set(cache_hit=True, stale=True)
+                logger.warning(f"Error fetching {url}, serving the cached copy instead: {e}")
+                return entry["body"]
+            logger.error(f"Error fetching {url}: {e}")
+            return ""
 
-def extract_trending_topics_from_google_trends(html_content: str) -> List[Dict[str, Any]]:
+def extract_trending_topics_from_google_trends(html_content: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Extract trending topics from Google Trends HTML.
     
     Args:
         html_content: HTML content from Google Trends
+        limit: Maximum number of trends to extract
         
     Returns:
         List of trending topics with title and description
     """
     topics = []
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        trend_items = soup.select('.feed-item-header')
+        trend_items = select_items(
+            html_content,
+            '.feed-item-header',
+            {"title": ('.title', None), "description": ('.summary-text', None)},
+            limit=limit,
+            required=("title",)
+        )
         
-        for item in trend_items[:10]:  # Get top 10 trends
-            title_elem = item.select_one('.title')
-            description_elem = item.select_one('.summary-text')
-            
-            if title_elem:
-                topic = {
-                    "title": title_elem.get_text().strip(),
-                    "description": description_elem.get_text().strip() if description_elem else "",
-                }
-                topics.append(topic)
+        for item in trend_items:
+            topics.append({
+                "title": item["title"],
+                "description": item["description"] or "",
+            })
     except Exception as e:
         logger.error(f"Error parsing Google Trends: {e}")
     
     return topics
 
-def search_web_for_topic(topic: str) -> List[Dict[str, Any]]:
+def search_web_for_topic(topic: str, limit: int = 5) -> List[Dict[str, Any]]:
     """
     Search the web for information about a topic.
     
     Args:
         topic: The topic to search for
+        limit: Maximum number of results to consider
         
     Returns:
         List of search results with title, url, and snippet
@@ -78,25 +243,14 @@ def search_web_for_topic(topic: str) -> List[Dict[str, Any]]:
         search_url = f"https://www.google.com/search?q={topic.replace(' ', '+')}"
         html_content = fetch_webpage(search_url)
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        search_results = []
-        
         # Extract search results (simplified)
-        result_elements = soup.select('.g')
-        for element in result_elements[:5]:  # Get top 5 results
-            title_elem = element.select_one('h3')
-            link_elem = element.select_one('a')
-            snippet_elem = element.select_one('.VwiC3b')
-            
-            if title_elem and link_elem and snippet_elem:
-                result = {
-                    "title": title_elem.get_text().strip(),
-                    "url": link_elem.get('href', ''),
-                    "snippet": snippet_elem.get_text().strip(),
-                }
-                search_results.append(result)
-                
-        return search_results
+        return select_items(
+            html_content,
+            '.g',
+            {"title": ('h3', None), "url": ('a', 'href'), "snippet": ('.VwiC3b', None)},
+            limit=limit,
+            required=("title", "url", "snippet")
+        )
     except Exception as e:
         logger.error(f"Error searching for {topic}: {e}")
         return []
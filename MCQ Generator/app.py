@@ -1,18 +1,71 @@
 import streamlit as st
-from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai.chat_models import ChatOpenAI
 from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-import random
 import os
+import random
+import time
 from dotenv import load_dotenv
+from index_cache import IndexCache, index_key
+from embedding_pipeline import RateLimiter, embed_chunks
+from pdf_ingestion import StreamingIndex
+from question_bank import QuestionBank, QuestionBankBuilder
 
 # Load environment variables
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 
+# Indexing settings (part of the index cache key)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Indexes of previously uploaded PDFs are reused across sessions
+INDEX_CACHE_DIR = ".index_cache"
+INDEX_CACHE_MAX_BYTES = 2 * 1024**3
+INDEX_CACHE_MAX_ENTRIES = 50
+
+# Embedding throughput (set the limits to your OpenAI quota)
+EMBEDDING_WORKERS = 4
+EMBEDDING_BATCH_TOKENS = 8000
+EMBEDDING_REQUESTS_PER_MINUTE = 500
+EMBEDDING_TOKENS_PER_MINUTE = 1_000_000
+
+# Pages split and embedded together while streaming a PDF into the index
+INGESTION_PAGES_PER_BATCH = 8
+
+# Question generation
+NUM_QUESTIONS = 4
+QUESTION_WORKERS = 4
+CHUNKS_PER_QUESTION = 2
+
+# Questions generated in the background per PDF and reused by later quizzes
+QUESTION_BANK_PATH = ".question_bank/questions.sqlite"
+QUESTION_BANK_SIZE = 20
+
+
+@st.cache_resource
+def get_index_cache():
+    return IndexCache(INDEX_CACHE_DIR, INDEX_CACHE_MAX_BYTES, INDEX_CACHE_MAX_ENTRIES)
+
+
+# Shared by all sessions so concurrent uploads stay within the quota together
+@st.cache_resource
+def get_embedding_rate_limiter():
+    return RateLimiter(EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_TOKENS_PER_MINUTE)
+
+
+@st.cache_resource
+def get_question_bank_builder():
+    return QuestionBankBuilder(
+        QuestionBank(QUESTION_BANK_PATH),
+        bank_size=QUESTION_BANK_SIZE,
+        first_batch=NUM_QUESTIONS,
+        chunks_per_question=CHUNKS_PER_QUESTION,
+        max_workers=QUESTION_WORKERS,
+    )
+
+
 # Streamlit UI
 st.set_page_config(page_title="MCQ Generator", layout="centered")
 
@@ -89,77 +142,89 @@ uploaded_file = st.file_uploader(
     label_visibility="collapsed",
 )
 
-temp_file_path = "temp_uploaded_file.pdf"
-
 if uploaded_file:
-    if "pdf_processed" not in st.session_state:
-        with st.spinner("Uploading and processing your PDF..."):
-            try:
-                # Save the uploaded file
-                with open(temp_file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                st.success("File uploaded and saved successfully!")
-            except Exception as e:
-                st.error(f"Error saving file: {e}")
-                st.stop()
-
-        # Analyze the PDF content (only once)
-        with st.spinner("Analyzing the PDF content..."):
-            loader = PyPDFLoader(temp_file_path)
-            documents = loader.load()
+    if "pdf_index" not in st.session_state:
+        # Analyze the PDF content (only once), reading it straight from the upload buffer
+        pdf_bytes = uploaded_file.getvalue()
+        embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+        index_cache = get_index_cache()
 
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            chunks = text_splitter.split_documents(documents)
+        # Skip embedding entirely when this PDF was indexed before
+        key = index_key(pdf_bytes, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL)
+        vectorstore = index_cache.load(key, embeddings)
+        if vectorstore is not None:
+            st.info("Reusing the index from a previous upload of this PDF.")
+            pdf_index = StreamingIndex(vectorstore)
+        else:
+            pdf_index = StreamingIndex.start(
+                pdf_bytes,
+                embeddings,
+                RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP),
+                pages_per_batch=INGESTION_PAGES_PER_BATCH,
+                on_complete=lambda vectorstore: index_cache.store(key, vectorstore),
+                max_workers=EMBEDDING_WORKERS,
+                rate_limiter=get_embedding_rate_limiter(),
+                max_tokens_per_batch=EMBEDDING_BATCH_TOKENS,
+            )
 
-            embeddings = OpenAIEmbeddings()
-            vectorstore = FAISS.from_documents(chunks, embeddings)
+        st.session_state["pdf_index"] = pdf_index
+        st.session_state["pdf_key"] = key
+        st.session_state["llm"] = ChatOpenAI(
+            model="gpt-3.5-turbo", model_kwargs={"response_format": {"type": "json_object"}}
+        )
 
-            retriever = vectorstore.as_retriever()
-            qa_chain = RetrievalQA.from_chain_type(
-                llm=ChatOpenAI(model="gpt-3.5-turbo"), retriever=retriever
-            )
+        # Generate the question bank in the background as soon as the PDF is indexed
+        get_question_bank_builder().ensure_started(key, pdf_index, st.session_state["llm"])
 
-            # Store the QA chain in session state
-            st.session_state["qa_chain"] = qa_chain
-            st.session_state["pdf_processed"] = True
-            st.success("PDF processed successfully! Click 'Generate MCQ' to start.")
-
-# Helper function to create MCQ answers
-def generate_mcq(question, correct_answer, qa_chain):
-    options = [correct_answer]
-    while len(options) < 4:
-        fake_answer = qa_chain.run(
-            f"Provide a plausible but incorrect answer for this question: {question}. "
-            "Avoid repeating previous options."
+    pdf_index = st.session_state["pdf_index"]
+    if "pdf_processed" not in st.session_state:
+        # Questions can be generated as soon as the first pages are indexed
+        with st.spinner("Analyzing the PDF content..."):
+            pdf_index.ready.wait()
+        if pdf_index.error:
+            st.error(f"Error processing PDF: {pdf_index.error}")
+            del st.session_state["pdf_index"]
+            st.stop()
+        st.session_state["pdf_processed"] = True
+        st.success("PDF processed successfully! Click 'Generate MCQ' to start.")
+
+    if not pdf_index.done.is_set():
+        st.caption(f"Still indexing: {pdf_index.pages_done}/{pdf_index.total_pages} pages are searchable so far.")
+    elif pdf_index.error:
+        # Indexing failed after the first pages, so questions only cover part of the PDF
+        st.warning(
+            f"Indexing stopped after {pdf_index.pages_done}/{pdf_index.total_pages} pages: {pdf_index.error}. "
+            "Questions will only cover the indexed pages."
         )
-        if fake_answer not in options and len(fake_answer.strip()) > 0:
-            options.append(fake_answer)
-    random.shuffle(options)
-    return options
+        if st.button("Retry indexing", key="retry_indexing"):
+            for session_key in ["pdf_index", "pdf_key", "pdf_processed", "quiz_ids", "questions"]:
+                st.session_state.pop(session_key, None)
+            st.rerun()
 
 # Generate quiz button
 if st.session_state.get("pdf_processed") and st.button("Generate MCQ", key="generate", help="Start generating the mcq"):
-    if "questions" not in st.session_state:
-        with st.spinner("Generating your MCQ... Please wait."):
-            st.session_state["questions"] = []
-            st.session_state["score"] = 0
-            st.session_state["current_question"] = 0
-
-            # Generate exactly 4 MCQs
-            for _ in range(4):
-                question = st.session_state["qa_chain"].run(
-                    "Create a multiple-choice question based on the document content. Provide only the question."
-                )
-                correct_answer = st.session_state["qa_chain"].run(
-                    f"Provide the correct answer for this question: {question}. "
-                    "Provide only the correct answer."
-                )
-                options = generate_mcq(question, correct_answer, st.session_state["qa_chain"])
-
-                st.session_state["questions"].append((question, options, correct_answer))
+    if "quiz_ids" not in st.session_state:
+        st.session_state["quiz_ids"] = []
+        st.session_state["score"] = 0
+        st.session_state["current_question"] = 0
+        # Retry an incomplete bank whose earlier generation job has ended
+        get_question_bank_builder().ensure_started(
+            st.session_state["pdf_key"], st.session_state["pdf_index"], st.session_state["llm"]
+        )
 
 # Show MCQs to user
-if "questions" in st.session_state:
+if "quiz_ids" in st.session_state:
+    builder = get_question_bank_builder()
+    pdf_key = st.session_state["pdf_key"]
+
+    # Add questions from the bank as they become ready, in random order for repeat quizzes
+    bank_questions = builder.bank.questions(pdf_key)
+    quiz_ids = st.session_state["quiz_ids"]
+    available = [question_id for question_id in bank_questions if question_id not in quiz_ids]
+    random.shuffle(available)
+    quiz_ids.extend(available[:max(0, NUM_QUESTIONS - len(quiz_ids))])
+    st.session_state["questions"] = [bank_questions[question_id] for question_id in quiz_ids]
+
     current_q = st.session_state["current_question"]
     if current_q < len(st.session_state["questions"]):
         question, options, correct_answer = st.session_state["questions"][current_q]
@@ -177,6 +242,14 @@ if "questions" in st.session_state:
         # Add a Next button to move to the next question
         if st.button("Next", key=f"next{current_q}"):
             st.session_state["current_question"] += 1
+    elif len(st.session_state["questions"]) < NUM_QUESTIONS and builder.is_generating(pdf_key):
+        # Wait for the next question from the background worker
+        with st.spinner("Generating your MCQ... Please wait."):
+            time.sleep(1)
+        st.rerun()
+    elif not st.session_state["questions"]:
+        st.error("No questions could be generated from this PDF. Please try again.")
+        del st.session_state["quiz_ids"]
     else:
         # All questions have been answered
         total_q = len(st.session_state["questions"])
@@ -192,7 +265,3 @@ if "questions" in st.session_state:
         for i, (question, _, correct_answer) in enumerate(st.session_state["questions"]):
             st.write(f"**Question {i + 1}:** {question}")
             st.write(f"**Correct Answer:** {correct_answer}")
-
-# Clean up temporary file
-if os.path.isfile(temp_file_path):
-    os.remove(temp_file_path)
\ No newline at end of file
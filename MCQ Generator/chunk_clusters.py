@@ -0,0 +1,89 @@
+"""
+Coverage-driven selection of question contexts.
+
+The stored chunk embeddings are grouped with k-means, and each question is
+given the chunks closest to the centre of a different cluster as its
+context, so questions cover different parts of the document without a
+retrieval call per question.
+"""
+import faiss
+import numpy as np
+
+
+def _chunk_vectors(vectorstore):
+    index = vectorstore.index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def _chunk_text(vectorstore, position):
+    doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
+    return doc.page_content
+
+
+def _kmeans_plus_plus(vectors, num_clusters, rng):
+    """Pick initial centroids spread over the data (k-means++ seeding)."""
+    centroids = [vectors[rng.integers(len(vectors))]]
+    distances = ((vectors - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, num_clusters):
+        total = distances.sum()
+        if total <= 0:
+            centroids.append(vectors[rng.integers(len(vectors))])
+            continue
+        centroid = vectors[rng.choice(len(vectors), p=distances / total)]
+        centroids.append(centroid)
+        distances = np.minimum(distances, ((vectors - centroid) ** 2).sum(axis=1))
+    return np.ascontiguousarray(centroids, dtype="float32")
+
+
+def cluster_contexts(vectorstore, num_contexts, chunks_per_context=2, niter=20, seed=1234):
+    """
+    Build one context per question from distinct chunk clusters.
+
+    Args:
+        vectorstore: FAISS vector store holding the document chunks
+        num_contexts: Number of contexts (questions) wanted
+        chunks_per_context: Chunks closest to a cluster centre joined into one context
+        niter: k-means iterations
+        seed: k-means seed, fixed so the same PDF gets the same clusters
+
+    Returns:
+        List of num_contexts context strings; when there are fewer chunks than
+        questions, clusters are reused with their next closest chunks
+    """
+    vectors = _chunk_vectors(vectorstore)
+    num_chunks = len(vectors)
+    if num_chunks == 0 or num_contexts <= 0:
+        return []
+
+    num_clusters = min(num_contexts, num_chunks)
+    if num_clusters == 1:
+        members = [list(range(num_chunks))]
+    else:
+        kmeans = faiss.Kmeans(vectors.shape[1], num_clusters, niter=niter, seed=seed, verbose=False)
+        kmeans.train(vectors, init_centroids=_kmeans_plus_plus(vectors, num_clusters, np.random.default_rng(seed)))
+        distances, assignments = kmeans.index.search(vectors, 1)
+
+        # Chunks of each cluster, closest to the centre first
+        members = [[] for _ in range(num_clusters)]
+        for position in np.argsort(distances[:, 0]):
+            members[assignments[position, 0]].append(int(position))
+        members = [cluster for cluster in members if cluster]
+
+    contexts = []
+    round_number = 0
+    while len(contexts) < num_contexts:
+        added = False
+        for cluster in members:
+            start = round_number * chunks_per_context
+            positions = cluster[start:start + chunks_per_context]
+            if not positions:
+                continue
+            contexts.append("\n\n".join(_chunk_text(vectorstore, position) for position in positions))
+            added = True
+            if len(contexts) == num_contexts:
+                break
+        if not added:
+            break
+        round_number += 1
+    return contexts
@@ -0,0 +1,150 @@
+"""
+Batched, concurrent embedding of document chunks into a FAISS index.
+
+Chunks are grouped into batches by an estimated token budget, several
+batches are embedded at once under a shared rate limit, and each batch is
+added to the index as soon as its vectors arrive. A batch failing with a
+rate limit or transient error is retried on its own without re-embedding
+the batches that already succeeded; any other error fails immediately.
+"""
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from langchain.vectorstores import FAISS
+
+# Rough characters-per-token ratio for English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def batch_by_token_budget(texts, max_tokens=8000, max_batch_size=256):
+    """Group text indices into batches that fit a token budget and a size cap."""
+    batches, current, current_tokens = [], [], 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class RateLimiter:
+    """Sliding one-minute window limiting requests and tokens across threads."""
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=1_000_000):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens):
+        # A single batch may never exceed the token limit on its own
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0][0] >= 60:
+                    self._calls.popleft()
+                used_tokens = sum(call_tokens for _, call_tokens in self._calls)
+                if (len(self._calls) < self.requests_per_minute
+                        and used_tokens + tokens <= self.tokens_per_minute):
+                    self._calls.append((now, tokens))
+                    return
+                wait = 60 - (now - self._calls[0][0])
+            time.sleep(max(wait, 0.05))
+
+
+# Exception class names of client timeouts and dropped connections (openai, httpx, requests)
+TRANSIENT_ERROR_NAMES = ("Timeout", "APIConnectionError", "ConnectError", "ServiceUnavailable")
+
+
+def _is_retryable_error(error):
+    """Whether an embedding request failed on a rate limit (429), server error (5xx), timeout or dropped connection."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    return any(name in type(error).__name__ for name in TRANSIENT_ERROR_NAMES)
+
+
+def _embed_batch(embeddings, texts, rate_limiter, max_retries, retry_base_delay):
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(sum(estimate_tokens(text) for text in texts))
+        try:
+            return embeddings.embed_documents(texts)
+        except Exception as e:
+            # Bad input and auth errors fail the same way on every attempt
+            if attempt == max_retries or not _is_retryable_error(e):
+                raise
+            # Exponential backoff with jitter
+            time.sleep(retry_base_delay * 2 ** attempt * (0.5 + random.random()))
+
+
+def embed_chunks(chunks, embeddings, vectorstore=None, max_workers=4, rate_limiter=None,
+                 max_tokens_per_batch=8000, max_retries=3, retry_base_delay=1.0, on_progress=None, lock=None):
+    """
+    Embed chunks concurrently and add them to a FAISS vector store.
+
+    Args:
+        chunks: Documents to embed
+        embeddings: Embeddings model
+        vectorstore: Existing vector store to add to (created from the first batch if None)
+        max_workers: Number of batches embedded at once
+        rate_limiter: Shared RateLimiter (a default one is created if None)
+        max_tokens_per_batch: Estimated token budget of one embedding request
+        max_retries: Retries of a batch failing with a rate limit or transient error
+        retry_base_delay: Initial backoff delay in seconds
+        on_progress: Optional callback receiving (embedded chunks, total chunks)
+        lock: Optional lock held while adding vectors to an existing vector store
+
+    Returns:
+        The vector store containing the chunks
+    """
+    rate_limiter = rate_limiter or RateLimiter()
+    texts = [chunk.page_content for chunk in chunks]
+    metadatas = [chunk.metadata for chunk in chunks]
+    batches = batch_by_token_budget(texts, max_tokens_per_batch)
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _embed_batch, embeddings, [texts[i] for i in batch], rate_limiter, max_retries, retry_base_delay
+            ): batch
+            for batch in batches
+        }
+        try:
+            # Vectors are added in arrival order; FAISS search does not depend on insertion order
+            for future in as_completed(futures):
+                batch = futures[future]
+                text_embeddings = list(zip([texts[i] for i in batch], future.result()))
+                batch_metadatas = [metadatas[i] for i in batch]
+                if vectorstore is None:
+                    vectorstore = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=batch_metadatas)
+                else:
+                    with lock or nullcontext():
+                        vectorstore.add_embeddings(text_embeddings, metadatas=batch_metadatas)
+
+                done += len(batch)
+                if on_progress:
+                    on_progress(done, len(texts))
+        except BaseException:
+            # Do not embed (and pay for) the remaining batches once one has failed
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return vectorstore
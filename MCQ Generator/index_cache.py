@@ -0,0 +1,111 @@
+"""
+On-disk cache of FAISS indexes built from uploaded PDFs.
+
+Indexes are addressed by the SHA-256 of the PDF bytes together with the
+splitter settings and the embedding model, so uploading the same PDF again
+reuses the stored vectors and chunks instead of embedding them again.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+
+import faiss
+from langchain.vectorstores import FAISS
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.faiss"
+DOCSTORE_FILENAME = "index.pkl"
+
+
+def index_key(pdf_bytes, chunk_size, chunk_overlap, embedding_model):
+    """Return the cache key of the index built from a PDF with the given settings."""
+    digest = hashlib.sha256(pdf_bytes)
+    digest.update(f"|{chunk_size}|{chunk_overlap}|{embedding_model}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class IndexCache:
+    """
+    Stores FAISS indexes and their chunks on disk with least-recently-used eviction.
+
+    Each entry is a directory holding the FAISS index and the pickled chunk
+    store written by `FAISS.save_local`. The index is memory-mapped when it is
+    loaded, so large textbooks are not read into memory up front.
+    """
+
+    def __init__(self, cache_dir=".index_cache", max_bytes=2 * 1024**3, max_entries=50):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key, embeddings):
+        """Return the cached vector store for a key, or None if it is not cached."""
+        entry_dir = self._entry_dir(key)
+        index_path = os.path.join(entry_dir, INDEX_FILENAME)
+        if not os.path.isfile(index_path):
+            return None
+
+        try:
+            try:
+                # IO_FLAG_MMAP alone still copies the vectors into memory; the in-place flag maps them
+                mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+                index = faiss.read_index(index_path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Older FAISS builds cannot memory-map flat indexes
+                index = faiss.read_index(index_path)
+            with open(os.path.join(entry_dir, DOCSTORE_FILENAME), "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable index cache entry {key}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(entry_dir)
+        return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+    def store(self, key, vectorstore):
+        """Persist a vector store under a key and evict old entries over the size caps."""
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp_")
+        try:
+            vectorstore.save_local(tmp_dir)
+            with self._lock:
+                entry_dir = self._entry_dir(key)
+                if os.path.isdir(entry_dir):
+                    # Another session stored the same PDF first
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                else:
+                    os.replace(tmp_dir, entry_dir)
+                self._evict()
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".tmp_") or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, filename)) for filename in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, path))
+
+        # Remove least recently used entries first
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total_bytes -= size
@@ -0,0 +1,107 @@
+"""
+Structured multiple-choice question generation.
+
+Each question is generated in a single LLM call that returns the question,
+its correct answer and three distractors as JSON, grounded in a given
+document context. Questions for different contexts are generated in parallel.
+"""
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+NUM_DISTRACTORS = 3
+
+MCQ_PROMPT = """Use the following excerpt from a document to write one multiple-choice question.
+
+Excerpt:
+{context}
+
+Requirements:
+- The question must be answerable from the excerpt alone.
+- Give the correct answer and exactly {num_distractors} plausible but incorrect answers.
+- All answers must be distinct and of similar length and style.
+
+Respond with only a JSON object of the form:
+{{"question": "...", "correct_answer": "...", "distractors": ["...", "...", "..."]}}"""
+
+
+def _extract_json(text):
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def parse_mcq(response):
+    """
+    Validate a JSON MCQ response.
+
+    Returns:
+        (question, shuffled options, correct answer), or None if the response is invalid
+    """
+    parsed = _extract_json(response)
+    if not isinstance(parsed, dict):
+        return None
+
+    question = parsed.get("question")
+    correct_answer = parsed.get("correct_answer")
+    distractors = parsed.get("distractors")
+    if not isinstance(question, str) or not question.strip():
+        return None
+    if not isinstance(correct_answer, str) or not correct_answer.strip():
+        return None
+    if not isinstance(distractors, list) or not all(isinstance(d, str) and d.strip() for d in distractors):
+        return None
+
+    question, correct_answer = question.strip(), correct_answer.strip()
+    options = [correct_answer] + [d.strip() for d in distractors]
+    if len(options) != NUM_DISTRACTORS + 1 or len({o.lower() for o in options}) != len(options):
+        return None
+
+    random.shuffle(options)
+    return question, options, correct_answer
+
+
+def generate_mcq(llm, context, max_attempts=2):
+    """Generate one MCQ for a context, or None if no valid response was returned."""
+    prompt = MCQ_PROMPT.format(context=context, num_distractors=NUM_DISTRACTORS)
+    for _ in range(max_attempts):
+        try:
+            mcq = parse_mcq(llm.invoke(prompt).content)
+        except Exception as e:
+            logger.error(f"Error generating MCQ: {e}")
+            mcq = None
+        if mcq:
+            return mcq
+    return None
+
+
+def generate_mcqs(llm, contexts, max_workers=4, on_mcq=None):
+    """
+    Generate one MCQ per context concurrently.
+
+    Questions that failed validation and repeats of an earlier question are
+    dropped, so fewer questions than contexts may be returned. Questions are
+    returned, and passed to on_mcq if given, in the order they finish.
+    """
+    mcqs, seen = [], set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(generate_mcq, llm, context) for context in contexts]
+        for future in as_completed(futures):
+            mcq = future.result()
+            if mcq is None:
+                continue
+            key = " ".join(mcq[0].lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            mcqs.append(mcq)
+            if on_mcq:
+                on_mcq(mcq)
+    return mcqs
@@ -0,0 +1,122 @@
+"""
+Streaming, page-level ingestion of PDFs into a FAISS index.
+
+Pages are parsed lazily from the uploaded bytes in memory, then split and
+embedded a few pages at a time on a background thread. The index can be
+searched as soon as the first pages are in, while later pages are still
+being added.
+"""
+import io
+import logging
+import threading
+
+from langchain.docstore.document import Document
+from pypdf import PdfReader
+
+from chunk_clusters import cluster_contexts
+from embedding_pipeline import embed_chunks
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pages(pdf_bytes):
+    """Yield one Document per PDF page, parsing each page only when it is reached."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    for number, page in enumerate(reader.pages):
+        yield Document(page_content=page.extract_text() or "", metadata={"page": number})
+
+
+def count_pages(pdf_bytes):
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+class StreamingIndex:
+    """
+    A FAISS index that is filled page by page on a background thread.
+
+    Searches and additions are serialized with a lock, so the index can be
+    queried while ingestion is still running.
+    """
+
+    def __init__(self, vectorstore=None):
+        self.vectorstore = vectorstore
+        self.total_pages = 0
+        self.pages_done = 0
+        self.error = None
+        self.ready = threading.Event()
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._contexts = {}
+        if vectorstore is not None:
+            self.ready.set()
+            self.done.set()
+
+    @classmethod
+    def start(cls, pdf_bytes, embeddings, text_splitter, pages_per_batch=8, on_complete=None, **embed_kwargs):
+        """
+        Start ingesting a PDF on a background thread.
+
+        Args:
+            pdf_bytes: Content of the PDF
+            embeddings: Embeddings model
+            text_splitter: Splitter applied to each page
+            pages_per_batch: Number of pages split and embedded together
+            on_complete: Optional callback receiving the vector store once every page is in
+            embed_kwargs: Extra arguments for embed_chunks
+
+        Returns:
+            The StreamingIndex being filled
+        """
+        index = cls()
+        thread = threading.Thread(
+            target=index._ingest,
+            args=(pdf_bytes, embeddings, text_splitter, pages_per_batch, on_complete, embed_kwargs),
+            daemon=True,
+        )
+        thread.start()
+        return index
+
+    def _ingest(self, pdf_bytes, embeddings, text_splitter, pages_per_batch, on_complete, embed_kwargs):
+        try:
+            self.total_pages = count_pages(pdf_bytes)
+            pages = []
+            for page in iter_pages(pdf_bytes):
+                pages.append(page)
+                if len(pages) == pages_per_batch:
+                    self._add_pages(pages, embeddings, text_splitter, embed_kwargs)
+                    pages = []
+            if pages:
+                self._add_pages(pages, embeddings, text_splitter, embed_kwargs)
+
+            if self.vectorstore is None:
+                raise ValueError("No text could be extracted from this PDF.")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+            self.done.set()
+
+        if on_complete and self.error is None:
+            # The index itself is complete, so a failing callback (such as a full cache disk) is only logged
+            try:
+                on_complete(self.vectorstore)
+            except Exception:
+                logger.exception("Error in index completion callback")
+
+    def _add_pages(self, pages, embeddings, text_splitter, embed_kwargs):
+        chunks = text_splitter.split_documents(pages)
+        if chunks:
+            vectorstore = embed_chunks(chunks, embeddings, vectorstore=self.vectorstore, lock=self._lock, **embed_kwargs)
+            with self._lock:
+                self.vectorstore = vectorstore
+            self.ready.set()
+        self.pages_done += len(pages)
+
+    def question_contexts(self, num_questions, chunks_per_context=2):
+        """Return one context per question from distinct chunk clusters of the chunks indexed so far."""
+        with self._lock:
+            # Clusters are recomputed only when chunks were added since the last call
+            key = (self.vectorstore.index.ntotal, num_questions, chunks_per_context)
+            if key not in self._contexts:
+                self._contexts = {key: cluster_contexts(self.vectorstore, num_questions, chunks_per_context)}
+            return self._contexts[key]
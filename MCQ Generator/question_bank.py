@@ -0,0 +1,143 @@
+"""
+Persistent question banks generated in the background.
+
+Questions for a PDF are generated on a worker thread right after indexing
+and stored in SQLite under the PDF's key, so a quiz can start with the first
+finished question while the rest are still being generated, and repeat
+uploads of the same PDF are served from the bank without any LLM calls.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from mcq_generation import generate_mcqs
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionBank:
+    """SQLite store of generated questions per PDF."""
+
+    def __init__(self, path=".question_bank/questions.sqlite"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS questions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pdf_key TEXT NOT NULL,
+                    question_key TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    correct_answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (pdf_key, question_key)
+                )"""
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS banks (pdf_key TEXT PRIMARY KEY, complete INTEGER NOT NULL)"
+            )
+
+    def add(self, pdf_key, mcq):
+        """Store a (question, options, correct answer) tuple; repeats of a stored question are ignored."""
+        question, options, correct_answer = mcq
+        question_key = " ".join(question.lower().split())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO questions "
+                "(pdf_key, question_key, question, options, correct_answer, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (pdf_key, question_key, question, json.dumps(options), correct_answer, time.time()),
+            )
+
+    def questions(self, pdf_key):
+        """Return {id: (question, options, correct answer)} for a PDF in generation order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, question, options, correct_answer FROM questions WHERE pdf_key = ? ORDER BY id",
+                (pdf_key,),
+            ).fetchall()
+        return {row[0]: (row[1], json.loads(row[2]), row[3]) for row in rows}
+
+    def count(self, pdf_key):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions WHERE pdf_key = ?", (pdf_key,)).fetchone()[0]
+
+    def is_complete(self, pdf_key):
+        with self._lock:
+            row = self._conn.execute("SELECT complete FROM banks WHERE pdf_key = ?", (pdf_key,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_complete(self, pdf_key):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO banks (pdf_key, complete) VALUES (?, 1)", (pdf_key,))
+
+
+class QuestionBankBuilder:
+    """
+    Fills question banks on background threads, one generation job per PDF.
+
+    The builder is shared by all sessions, so several users uploading the same
+    PDF at once share a single job.
+    """
+
+    def __init__(self, bank, bank_size=20, first_batch=4, chunks_per_question=2, max_workers=4):
+        self.bank = bank
+        self.bank_size = bank_size
+        self.first_batch = first_batch
+        self.chunks_per_question = chunks_per_question
+        self.max_workers = max_workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def ensure_started(self, pdf_key, pdf_index, llm):
+        """Start generating the bank of a PDF unless it is complete or already being generated."""
+        if self.bank.is_complete(pdf_key):
+            return
+        with self._lock:
+            job = self._jobs.get(pdf_key)
+            if job and job.is_alive():
+                return
+            job = threading.Thread(target=self._build, args=(pdf_key, pdf_index, llm), daemon=True)
+            self._jobs[pdf_key] = job
+            job.start()
+
+    def is_generating(self, pdf_key):
+        with self._lock:
+            job = self._jobs.get(pdf_key)
+        return bool(job and job.is_alive())
+
+    def _build(self, pdf_key, pdf_index, llm):
+        try:
+            self._fill(pdf_key, pdf_index, llm)
+        except Exception as e:
+            logger.exception(f"Error generating question bank {pdf_key}: {e}")
+
+    def _fill(self, pdf_key, pdf_index, llm):
+        pdf_index.ready.wait()
+        if pdf_index.error:
+            return
+
+        # Serve a first quiz from the pages indexed so far, then fill the bank from the whole document
+        if not pdf_index.done.is_set():
+            self._generate(pdf_key, pdf_index, llm, self.first_batch - self.bank.count(pdf_key))
+            pdf_index.done.wait()
+            if pdf_index.error:
+                return
+
+        self._generate(pdf_key, pdf_index, llm, self.bank_size - self.bank.count(pdf_key))
+        # Leave a bank too small for a full quiz open so a later upload tries again
+        if self.bank.count(pdf_key) >= self.first_batch:
+            self.bank.mark_complete(pdf_key)
+
+    def _generate(self, pdf_key, pdf_index, llm, num_questions):
+        if num_questions <= 0:
+            return
+        contexts = pdf_index.question_contexts(num_questions, self.chunks_per_question)
+        generate_mcqs(
+            llm, contexts, max_workers=self.max_workers, on_mcq=lambda mcq: self.bank.add(pdf_key, mcq)
+        )
@@ -3,7 +3,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
-os.environ["ACTIVELOOP_TOKEN"] os.getenv("ACTIVELOOP_TOKEN")
+os.environ["ACTIVELOOP_TOKEN"] = os.getenv("ACTIVELOOP_TOKEN", "")
 
 import os
 import streamlit as st
@@ -17,6 +17,18 @@ from langchain import hub
 import gtts
 from io import BytesIO
 import tempfile
+import threading
+import logging
+from local_index import LocalVectorIndex, LocalRetriever, CachedQueryEmbeddings, load_embeddings
+from resources import timed, snapshot
+from streaming_asr import StreamingTranscriber, frame_to_mono_16k
+
+# Local index written by convert_deeplake.py; the remote DeepLake dataset is used when it is missing
+LOCAL_INDEX_DIR = os.getenv("PHYSICS_INDEX_DIR", "physics_index")
+QUERY_CACHE_SIZE = 1024
+WHISPER_MODEL = "base"
+
+logger = logging.getLogger(__name__)
 
 # Initialize Streamlit page configuration
 st.set_page_config(page_title="AI Physics Tutor", layout="wide")
@@ -27,8 +39,14 @@ if 'chat_history' not in st.session_state:
 
 def initialize_rag_system():
     """Initialize the RAG system components"""
+    # Prefer the local index, embedding queries with the model it was built with
+    if os.path.isdir(LOCAL_INDEX_DIR):
+        index = LocalVectorIndex(LOCAL_INDEX_DIR)
+        embeddings = CachedQueryEmbeddings(load_embeddings(index.embedding_model), QUERY_CACHE_SIZE)
+        return LocalRetriever(index, embeddings, k=3)
+
     # Initialize embeddings
-    embeddings = OpenAIEmbeddings(model="text-embedding-ada-002")
+    embeddings = CachedQueryEmbeddings(OpenAIEmbeddings(model="text-embedding-ada-002"), QUERY_CACHE_SIZE)
     
     # Connect to existing DeepLake dataset
     dataset_path = f"hub://jacobasir/Phyics_Ncert"
@@ -60,17 +78,47 @@ def create_agent(retriever):
     agent = create_openai_functions_agent(llm, tools, prompt)
     return AgentExecutor(agent=agent, tools=tools, verbose=True)
 
+# Built once per process and shared by all sessions; concurrent callers wait for the same build
+@st.cache_resource(show_spinner=False)
+@timed("retriever")
+def get_retriever():
+    return initialize_rag_system()
+
+@st.cache_resource(show_spinner=False)
+@timed("agent")
+def get_agent():
+    return create_agent(get_retriever())
+
+@st.cache_resource(show_spinner=False)
+@timed("whisper")
+def get_whisper_model():
+    return whisper.load_model(WHISPER_MODEL)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """Build the agent and the Whisper model on a background thread, once per process."""
+    def build_all():
+        for build in (get_agent, get_whisper_model):
+            try:
+                build()
+            except Exception as e:
+                logger.exception(f"Failed to warm {build.__name__}: {e}")
+
+    thread = threading.Thread(target=build_all, name="resource-warmup", daemon=True)
+    thread.start()
+    return thread
+
 class AudioProcessor(AudioProcessorBase):
     def __init__(self):
-        self.audio_buffer = []
+        # Utterances are transcribed in the background as soon as the speaker pauses
+        self.transcriber = StreamingTranscriber(get_whisper_model())
 
     def recv(self, frame):
-        audio_data = frame.to_ndarray() / 32768.0
-        self.audio_buffer.extend(audio_data)
+        self.transcriber.feed(frame_to_mono_16k(frame))
         return frame
 
-    def get_audio_buffer(self):
-        return np.array(self.audio_buffer, dtype=np.float32)
+    def on_ended(self):
+        self.transcriber.close()
 
 def text_to_speech(text):
     """Convert text to speech using gTTS"""
@@ -83,9 +131,19 @@ def main():
     st.title("🎓 AI Physics Tutor")
     st.markdown("---")
 
-    # Initialize RAG system and agent
-    retriever = initialize_rag_system()
-    agent_executor = create_agent(retriever)
+    # Load everything in the background on the first run, then wait for the agent
+    start_warmup()
+    with st.spinner("Loading the physics tutor..."):
+        agent_executor = get_agent()
+
+    with st.sidebar.expander("Resource load times"):
+        for name, metrics in snapshot().items():
+            if metrics["load_seconds"] is not None:
+                st.write(f"{name}: {metrics['status']} in {metrics['load_seconds']:.2f}s")
+            elif metrics["error"]:
+                st.write(f"{name}: {metrics['status']} ({metrics['error']})")
+            else:
+                st.write(f"{name}: {metrics['status']}")
 
     # Create two columns for the interface
     col1, col2 = st.columns([2, 1])
@@ -104,8 +162,9 @@ def main():
         input_method = st.radio("Choose input method:", ["Text", "Voice"])
 
         if input_method == "Voice":
-            # Initialize Whisper model
-            model = whisper.load_model("base")
+            # Load the shared Whisper model before the audio processor needs it
+            with st.spinner("Loading speech recognition..."):
+                get_whisper_model()
 
             # WebRTC audio streamer
             audio_processor = webrtc_streamer(
@@ -116,17 +175,20 @@ def main():
                 async_processing=True,
             )
 
+            if audio_processor and audio_processor.audio_processor:
+                transcript = audio_processor.audio_processor.transcriber.peek_text()
+                if transcript:
+                    st.caption(f"Heard so far: {transcript}")
+
             if st.button("Process Voice Input"):
                 if audio_processor and audio_processor.audio_processor:
-                    audio_buffer = audio_processor.audio_processor.get_audio_buffer()
-                    if len(audio_buffer) > 0:
-                        # Process audio with Whisper
-                        audio = whisper.pad_or_trim(audio_buffer)
-                        mel = whisper.log_mel_spectrogram(audio).to(model.device)
-                        result = model.transcribe(audio_buffer)
-                        
+                    # Finish the utterance in progress and wait for its transcription
+                    transcriber = audio_processor.audio_processor.transcriber
+                    transcriber.flush()
+                    transcriber.wait_idle(timeout=30)
+                    user_input = transcriber.pop_text()
+                    if user_input:
                         # Display transcribed text
-                        user_input = result["text"]
                         st.session_state.chat_history.append({"role": "user", "content": user_input})
                         
                         # Get agent response
@@ -0,0 +1,59 @@
+"""
+Convert the DeepLake physics dataset into a local index directory.
+
+Usage:
+    python convert_deeplake.py                                   # keep the stored ada-002 embeddings
+    python convert_deeplake.py --embedding-model local:all-MiniLM-L6-v2   # re-embed for offline use
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+from local_index import build_local_index, load_embeddings
+
+DEFAULT_DATASET = "hub://jacobasir/Phyics_Ncert"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+def read_dataset(dataset_path):
+    """Return the texts, embeddings and metadata stored in a DeepLake dataset."""
+    import deeplake
+
+    ds = deeplake.load(dataset_path, read_only=True, token=os.getenv("ACTIVELOOP_TOKEN"))
+    texts = ds.text.data()["value"]
+    embeddings = ds.embedding.numpy()
+    metadatas = ds.metadata.data()["value"] if "metadata" in ds.tensors else None
+    return texts, embeddings, metadatas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="DeepLake dataset path")
+    parser.add_argument("--output", default="physics_index", help="Directory to write the local index to")
+    parser.add_argument(
+        "--embedding-model",
+        default=DEFAULT_EMBEDDING_MODEL,
+        help="Model of the stored embeddings, or another model to re-embed the texts with",
+    )
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32", help="Vector storage dtype")
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per batch when re-embedding")
+    args = parser.parse_args()
+
+    load_dotenv()
+    texts, vectors, metadatas = read_dataset(args.dataset)
+    print(f"Read {len(texts)} chunks from {args.dataset}")
+
+    if args.embedding_model != DEFAULT_EMBEDDING_MODEL:
+        embeddings = load_embeddings(args.embedding_model)
+        vectors = []
+        for start in range(0, len(texts), args.batch_size):
+            vectors.extend(embeddings.embed_documents(texts[start:start + args.batch_size]))
+            print(f"Embedded {min(start + args.batch_size, len(texts))}/{len(texts)} chunks")
+
+    build_local_index(args.output, texts, vectors, args.embedding_model, metadatas=metadatas, dtype=args.dtype)
+    print(f"Wrote local index to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local, on-disk vector index for the physics tutor.
+
+An index directory holds:
+    vectors.npy   normalized chunk embeddings (float32 or float16), memory-mapped on load
+    chunks.jsonl  one {"text": ..., "metadata": ...} object per vector
+    meta.json     dimension, dtype, vector count and the embedding model used
+    index.faiss   optional HNSW graph over the vectors (written when faiss is installed),
+                  storing them in the same precision as vectors.npy
+
+Searches use the HNSW graph when it is present and fall back to an exact
+cosine-similarity scan over the memory-mapped vectors otherwise. Either
+way the vectors stay memory-mapped instead of being loaded into RAM.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain.docstore.document import Document
+from langchain.embeddings.base import Embeddings
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+VECTORS_FILENAME = "vectors.npy"
+CHUNKS_FILENAME = "chunks.jsonl"
+META_FILENAME = "meta.json"
+HNSW_FILENAME = "index.faiss"
+
+# Prefix of embedding model names that are run locally with sentence-transformers
+LOCAL_MODEL_PREFIX = "local:"
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def build_local_index(path, texts, vectors, embedding_model, metadatas=None, dtype="float32", hnsw_m=32):
+    """
+    Write a local index directory.
+
+    Args:
+        path: Directory to write the index to
+        texts: Chunk texts
+        vectors: Chunk embeddings, one row per text
+        embedding_model: Name of the model that produced the embeddings
+        metadatas: Optional metadata dict per text
+        dtype: Storage dtype of the vectors ("float32" or "float16")
+        hnsw_m: Neighbours per HNSW node (the graph is only built when faiss is installed)
+
+    Raises:
+        ValueError: If there are no vectors to index
+    """
+    vectors = _normalize(vectors)
+    if vectors.ndim != 2 or not len(vectors):
+        raise ValueError("Cannot build a local index with no vectors")
+    os.makedirs(path, exist_ok=True)
+    metadatas = metadatas or [{} for _ in texts]
+
+    np.save(os.path.join(path, VECTORS_FILENAME), vectors.astype(dtype))
+    with open(os.path.join(path, CHUNKS_FILENAME), "w", encoding="utf-8") as f:
+        for text, metadata in zip(texts, metadatas):
+            f.write(json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+    if faiss is not None:
+        # Inner product on normalized vectors is cosine similarity
+        if dtype == "float16":
+            index = faiss.IndexHNSWSQ(vectors.shape[1], faiss.ScalarQuantizer.QT_fp16, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        else:
+            index = faiss.IndexHNSWFlat(vectors.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.add(vectors)
+        faiss.write_index(index, os.path.join(path, HNSW_FILENAME))
+
+    with open(os.path.join(path, META_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({
+            "dimension": int(vectors.shape[1]),
+            "count": int(vectors.shape[0]),
+            "dtype": dtype,
+            "embedding_model": embedding_model,
+        }, f, indent=2)
+
+
+class LocalVectorIndex:
+    """Read-only view of a local index directory."""
+
+    def __init__(self, path, hnsw_ef_search=64):
+        with open(os.path.join(path, META_FILENAME), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(os.path.join(path, VECTORS_FILENAME), mmap_mode="r")
+        with open(os.path.join(path, CHUNKS_FILENAME), encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f]
+
+        self.hnsw = None
+        hnsw_path = os.path.join(path, HNSW_FILENAME)
+        if faiss is not None and os.path.isfile(hnsw_path):
+            # Map the stored vectors in place; only the graph itself is read into memory
+            self.hnsw = faiss.read_index(hnsw_path, getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP))
+            self.hnsw.hnsw.efSearch = hnsw_ef_search
+
+    @property
+    def embedding_model(self):
+        return self.meta["embedding_model"]
+
+    def search(self, query_vector, k=3):
+        """Return the k most similar chunks as (text, metadata, cosine similarity) tuples."""
+        if not len(self.chunks):
+            return []
+        query = _normalize(query_vector).reshape(1, -1)
+        if self.hnsw is not None:
+            scores, positions = self.hnsw.search(query, k)
+            scores, positions = scores[0], positions[0]
+        else:
+            similarities = self._scan(query[0])
+            k = min(k, len(similarities))
+            top = np.argpartition(-similarities, k - 1)[:k]
+            positions = top[np.argsort(-similarities[top])]
+            scores = similarities[positions]
+        return [
+            (self.chunks[position]["text"], self.chunks[position]["metadata"], float(score))
+            for position, score in zip(positions, scores)
+            if position >= 0
+        ]
+
+    def _scan(self, query, block_size=8192):
+        # numpy has no fast float16 matmul, so float16 vectors are upcast one block at a time
+        if self.vectors.dtype == np.float32:
+            return self.vectors @ query
+        return np.concatenate([
+            self.vectors[start:start + block_size].astype(np.float32) @ query
+            for start in range(0, len(self.vectors), block_size)
+        ])
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Wraps an embeddings model with an LRU cache of query embeddings."""
+
+    def __init__(self, embeddings, maxsize=1024):
+        self.embeddings = embeddings
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_query(self, text):
+        key = " ".join(text.lower().split())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = vector
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return vector
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+
+def load_embeddings(embedding_model):
+    """Create the embeddings model for a model name; "local:<name>" runs a sentence-transformers model offline."""
+    if embedding_model.startswith(LOCAL_MODEL_PREFIX):
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=embedding_model[len(LOCAL_MODEL_PREFIX):])
+
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=embedding_model)
+
+
+class LocalRetriever:
+    """Retrieves physics chunks from a local index with cached query embeddings."""
+
+    def __init__(self, index, embeddings, k=3):
+        self.index = index
+        self.embeddings = embeddings
+        self.k = k
+
+    def get_relevant_documents(self, query):
+        query_vector = self.embeddings.embed_query(query)
+        return [
+            Document(page_content=text, metadata={**metadata, "score": score})
+            for text, metadata, score in self.index.search(query_vector, self.k)
+        ]
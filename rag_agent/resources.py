@@ -0,0 +1,44 @@
+"""
+Load-time metrics for the physics tutor's cached resources.
+
+The retriever, the agent and the Whisper model are built once per process
+by st.cache_resource in app.py. Wrapping their builders with timed() records
+the status and build time of each resource for display in the app.
+"""
+import functools
+import threading
+import time
+
+# Status, load time and last error per resource name
+metrics = {}
+_lock = threading.Lock()
+
+
+def timed(name):
+    """Decorate a resource builder to record its load status and time under name."""
+    with _lock:
+        metrics.setdefault(name, {"status": "not loaded", "load_seconds": None, "error": None})
+
+    def decorator(build):
+        @functools.wraps(build)
+        def wrapper(*args, **kwargs):
+            with _lock:
+                metrics[name].update(status="loading")
+            started = time.perf_counter()
+            try:
+                resource = build(*args, **kwargs)
+            except Exception as e:
+                with _lock:
+                    metrics[name].update(status="failed", error=str(e))
+                raise
+            with _lock:
+                metrics[name].update(status="loaded", load_seconds=time.perf_counter() - started, error=None)
+            return resource
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Return a copy of the metrics that is safe to render while resources load."""
+    with _lock:
+        return {name: dict(values) for name, values in metrics.items()}
@@ -0,0 +1,222 @@
+"""
+Streaming speech recognition for the voice input of the physics tutor.
+
+Incoming WebRTC audio is converted to 16 kHz mono float32 and written into a
+preallocated ring buffer. An energy-based voice activity detector splits the
+stream into utterances, and each finished utterance is transcribed by
+Whisper on a worker thread, so the text is ready shortly after the user
+stops speaking and memory use does not grow with the length of the session.
+"""
+import logging
+import queue
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# The Whisper model is shared by all sessions, so transcriptions run one at a time
+_transcribe_lock = threading.Lock()
+
+
+class RingBuffer:
+    """Fixed-size float32 sample buffer addressed by absolute sample positions."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.total_written = 0
+        self._lock = threading.Lock()
+
+    def write(self, samples):
+        skipped = max(0, len(samples) - self.capacity)
+        samples = samples[skipped:]
+        with self._lock:
+            self.total_written += skipped
+            start = self.total_written % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self.buffer[start:start + first] = samples[:first]
+            self.buffer[:len(samples) - first] = samples[first:]
+            self.total_written += len(samples)
+
+    def read(self, start, end):
+        """Copy samples [start, end), or return None if they were already overwritten."""
+        with self._lock:
+            if start < self.total_written - self.capacity or end > self.total_written:
+                return None
+            indices = np.arange(start, end) % self.capacity
+            return self.buffer[indices].copy()
+
+
+def frame_to_mono_16k(frame):
+    """Convert an av.AudioFrame of signed 16-bit samples to 16 kHz mono float32."""
+    samples = frame.to_ndarray()
+    channels = len(frame.layout.channels)
+    if frame.format.is_planar:
+        audio = samples.astype(np.float32).mean(axis=0)
+    else:
+        audio = samples.reshape(-1, channels).astype(np.float32).mean(axis=1)
+    audio /= 32768.0
+
+    if frame.sample_rate != SAMPLE_RATE:
+        target_length = int(round(len(audio) * SAMPLE_RATE / frame.sample_rate))
+        audio = np.interp(
+            np.linspace(0, len(audio) - 1, target_length), np.arange(len(audio)), audio
+        ).astype(np.float32)
+    return audio
+
+
+class EnergyVAD:
+    """
+    Splits a sample stream into utterances by frame energy.
+
+    A frame is speech when its RMS level is a margin above an adaptive noise
+    floor. An utterance ends after a stretch of silence, or when it reaches
+    the maximum length Whisper transcribes in one window. Utterances are cut
+    shortly after their last speech frame, and those with less speech than
+    min_speech_ms (clicks, bumps) are dropped.
+    """
+
+    def __init__(self, frame_ms=30, margin_db=10.0, min_level_db=-50.0, silence_ms=600,
+                 min_speech_ms=250, max_segment_seconds=25.0, padding_ms=200):
+        self.frame_length = SAMPLE_RATE * frame_ms // 1000
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self.silence_frames = silence_ms // frame_ms
+        self.min_speech_samples = SAMPLE_RATE * min_speech_ms // 1000
+        self.max_segment_samples = int(SAMPLE_RATE * max_segment_seconds)
+        self.padding_samples = SAMPLE_RATE * padding_ms // 1000
+        self.noise_db = min_level_db
+        self.position = 0
+        self.segment_start = None
+        self.silent_frames = 0
+        self.speech_samples = 0
+        self.last_speech_end = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples):
+        """Consume samples and return the (start, end) positions of utterances that ended."""
+        segments = []
+        self._pending = np.concatenate([self._pending, samples])
+        while len(self._pending) >= self.frame_length:
+            frame, self._pending = self._pending[:self.frame_length], self._pending[self.frame_length:]
+            level_db = 20 * np.log10(np.sqrt(np.mean(frame ** 2)) + 1e-10)
+            is_speech = level_db > max(self.noise_db + self.margin_db, self.min_level_db)
+            frame_end = self.position + self.frame_length
+
+            if is_speech:
+                if self.segment_start is None:
+                    self.segment_start = self.position
+                    self.speech_samples = 0
+                self.silent_frames = 0
+                self.speech_samples += self.frame_length
+                self.last_speech_end = frame_end
+            else:
+                # Track the noise floor only outside speech
+                self.noise_db = 0.95 * self.noise_db + 0.05 * level_db
+                if self.segment_start is not None:
+                    self.silent_frames += 1
+
+            self.position = frame_end
+            if self.segment_start is not None:
+                if (self.silent_frames >= self.silence_frames
+                        or frame_end - self.segment_start >= self.max_segment_samples):
+                    segments.extend(self._close())
+
+        return segments
+
+    def flush(self):
+        """End the current utterance, if any, at the last processed sample."""
+        if self.segment_start is None:
+            return []
+        return self._close()
+
+    def _close(self):
+        # Keep a little audio after the last speech frame, but never past what was processed
+        segment = (self.segment_start, min(self.last_speech_end + self.padding_samples, self.position))
+        enough_speech = self.speech_samples >= self.min_speech_samples
+        self.segment_start = None
+        self.silent_frames = 0
+        return [segment] if enough_speech else []
+
+
+class StreamingTranscriber:
+    """Transcribes utterances from a live audio stream on a worker thread."""
+
+    def __init__(self, model, buffer_seconds=60, **vad_kwargs):
+        self.model = model
+        self.ring = RingBuffer(SAMPLE_RATE * buffer_seconds)
+        self.vad = EnergyVAD(**vad_kwargs)
+        self._segments = queue.Queue()
+        # Utterances queued or being transcribed; the worker notifies _idle when it reaches zero
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._texts = []
+        self._texts_lock = threading.Lock()
+        self._vad_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="whisper-stream", daemon=True)
+        self._worker.start()
+
+    def feed(self, samples):
+        """Add 16 kHz mono samples to the stream."""
+        self.ring.write(samples)
+        with self._vad_lock:
+            for segment in self.vad.process(samples):
+                self._enqueue(segment)
+
+    def flush(self):
+        """Transcribe the utterance in progress without waiting for silence."""
+        with self._vad_lock:
+            for segment in self.vad.flush():
+                self._enqueue(segment)
+
+    def wait_idle(self, timeout=None):
+        """Wait until every queued utterance has been transcribed; returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def peek_text(self):
+        with self._texts_lock:
+            return " ".join(self._texts)
+
+    def pop_text(self):
+        """Return the text transcribed so far and start a new transcript."""
+        with self._texts_lock:
+            text, self._texts = " ".join(self._texts), []
+        return text
+
+    def close(self):
+        """Stop the worker thread once the queued utterances are transcribed."""
+        self._segments.put(None)
+
+    def _enqueue(self, segment):
+        with self._idle:
+            self._pending += 1
+        self._segments.put(segment)
+
+    def _run(self):
+        while True:
+            segment = self._segments.get()
+            if segment is None:
+                return
+            start, end = segment
+            try:
+                audio = self.ring.read(start, end)
+                if audio is None:
+                    logger.warning("Dropped an utterance that was overwritten before it could be transcribed")
+                    continue
+                with _transcribe_lock:
+                    result = self.model.transcribe(audio, fp16=False)
+                text = result["text"].strip()
+                if text:
+                    with self._texts_lock:
+                        self._texts.append(text)
+            except Exception as e:
+                logger.exception(f"Error transcribing audio: {e}")
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.notify_all()